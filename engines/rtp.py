@@ -8,6 +8,7 @@ import threading
 import socket
 import json
 import os
+import signal
 
 # Disable all warnings for clean container logs
 warnings.filterwarnings("ignore")
@@ -68,88 +69,49 @@ def receiver_thread(sock, metrics, stop_event):
             if not stop_event.is_set():
                 print(f"Receiver error: {e}")
 
-if __name__ == "__main__":
-    # parse arguments
-    parser = argparse.ArgumentParser()
+def derive_source_port(call_id):
+    # ---------------------------------------------------------
+    #  Deterministic Source Port from CALL ID
+    #  Goal: Map CALL-XXXX -> Port 30000..39999 (modulo 10000)
+    # ---------------------------------------------------------
+    target_port = 0
 
-    # Allow Controller modification and debug level sets.
-    binding_group = parser.add_argument_group('Binding', 'These options change how traffic is bound/sent')
-    binding_group.add_argument("--destination-ip", "-dip", "-D", help="Destination IP for the RTP stream",
-                               type=str, required=True)
-    binding_group.add_argument("--destination-port", "-dport",
-                               help="Destination port for the RTP stream (Default 6100)", type=int,
-                               default=6100)
-    binding_group.add_argument("--source-ip", "-sip", "-S", help="Source IP for the RTP stream. If not specified, "
-                                                                 "the kernel will auto-select.",
-                               type=str, default=None)
-    binding_group.add_argument("--source-port", "-sport",
-                               help="Source port for the RTP stream. If not specified, "
-                                    "the kernel will auto-select.", type=int,
-                               default=0)
-    binding_group.add_argument("--source-interface",
-                               help="Source interface RTP stream. (Ignored for L3 send)", type=str,
-                               default=None)
-    options_group = parser.add_argument_group('Options', "Configurable options for traffic sending.")
-    options_group.add_argument("--min-count", "-C", help="Minimum number of packets to send (Default 4500)",
-                               type=int, default=4500)
-    options_group.add_argument("--max-count", help="Maximum number of packets to send (Default 90000)",
-                               type=int, default=90000)
-    options_group.add_argument("--call-id", help="Call ID to embed in the payload for tracking",
-                               type=str, default="NONE")
-
-#   args = vars(parser.parse_args())
+    if call_id.startswith("CALL-") and call_id[5:].isdigit():
+        try:
+            raw_num = int(call_id[5:])
 
-#   # pull args for count.
-#   min_count = args['min_count']
-#   max_count = args['max_count']
-#   count = random.randrange(min_count, max_count)
-    
-#   source_port = args['source_port']
-#   if source_port == 0:
-#       # Use a random port but fixed for this entire call session
-#       source_port = random.randrange(10000, 65535)
+            # Warn if we see huge numbers (unexpected from orchestrator)
+            if raw_num > 9999:
+                print(f"Warning: CALL ID {call_id} exceeds 4 digits. Modulo will be applied.")
 
-    args = vars(parser.parse_args())
+            # 0..9999
+            call_num = raw_num % 10000
 
-    # pull args for count.
-    min_count = args['min_count']
-    max_count = args['max_count']
-    count = random.randrange(min_count, max_count)
+            # Map to 30000..39999
+            target_port = 30000 + call_num
 
-    source_port = args['source_port']
-    if source_port == 0:
-        # ---------------------------------------------------------
-        #  NEW LOGIC: Deterministic Source Port from CALL ID
-        #  Goal: Map CALL-XXXX -> Port 30000..39999 (modulo 10000)
-        # ---------------------------------------------------------
-        call_id = args.get('call_id', 'NONE')
-        
-        target_port = 0
-        
-        if call_id.startswith("CALL-") and call_id[5:].isdigit():
-            try:
-                raw_num = int(call_id[5:])
-                
-                # Warn if we see huge numbers (unexpected from orchestrator)
-                if raw_num > 9999:
-                    print(f"Warning: CALL ID {call_id} exceeds 4 digits. Modulo will be applied.")
+        except ValueError:
+            target_port = 0
 
-                # 0..9999
-                call_num = raw_num % 10000
-                
-                # Map to 30000..39999
-                target_port = 30000 + call_num
-                
-            except ValueError:
-                target_port = 0
+    if target_port > 0:
+        return target_port
+    # Fallback: specific random range 40000-45000
+    # (Distinct from the 3xxxx range to avoid collision/confusion)
+    return random.randrange(40000, 45000)
 
-        if target_port > 0:
-            source_port = target_port
-        else:
-            # Fallback: specific random range 40000-45000
-            # (Distinct from the 3xxxx range to avoid collision/confusion)
-            source_port = random.randrange(40000, 45000)
+def run_call(host, port, num_packets, interface=None, call_id="NONE",
+             source_ip=None, source_port=0, abort_event=None):
+    """
+    Send one RTP call and return its QoS summary.
 
+    Importable entry point; the voice orchestrator runs it inside a worker process
+    set up by `init_call_worker` and invoked through `run_call_in_worker`.
+    `abort_event` (threading or multiprocessing Event) stops the call early on shutdown.
+    `interface` is accepted for parity with --source-interface (ignored for L3 send).
+    """
+    count = num_packets
+    if source_port == 0:
+        source_port = derive_source_port(call_id)
 
     # Setup receiving socket to capture echoes
     metrics = VoiceMetrics()
@@ -157,12 +119,12 @@ if __name__ == "__main__":
     recv_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     try:
         # If source_ip is specified, bind to it. Else bind to all.
-        bind_ip = args['source_ip'] if args['source_ip'] else '0.0.0.0'
+        bind_ip = source_ip if source_ip else '0.0.0.0'
         recv_sock.bind((bind_ip, source_port))
     except Exception as e:
         print(f"Warning: Could not bind receiver socket to port {source_port}: {e}")
         # We continue anyway, but RTT/Loss metrics will be 0/100%
-    
+
     t = threading.Thread(target=receiver_thread, args=(recv_sock, metrics, stop_event))
     t.daemon = True
     t.start()
@@ -175,24 +137,23 @@ if __name__ == "__main__":
     payload_padding = b"".join(udp_payload_parts)
 
     # Create payload with embedded Call ID
-    call_id_tag = f"CID:{args.get('call_id', 'NONE')}:".encode()
+    call_id_tag = f"CID:{call_id}:".encode()
     final_payload = (call_id_tag + payload_padding)[:200]
-    
-    timestamp = time.strftime('%H:%M:%S')
-    print(f"[{timestamp}] [{args['call_id']}] 🚀 Executing: python3 rtp.py -D {args['destination_ip']} -dport {args['destination_port']} --min-count {args['min_count']} --max-count {args['max_count']} --source-interface {args['source_interface']} --call-id {args['call_id']}")
-    print(f"[{timestamp}] [{args['call_id']}] 📞 CALL STARTED: {args['destination_ip']}:{args['destination_port']} | G.711-ulaw | {int(args['min_count'] * 0.03)}s")
 
     # Pre-build packet template for performance
-    if args['source_ip'] is None:
-        base_packet = IP(dst=args['destination_ip'], proto=17, len=240, tos=184)  # DSCP EF (46)
+    if source_ip is None:
+        base_packet = IP(dst=host, proto=17, len=240, tos=184)  # DSCP EF (46)
     else:
-        base_packet = IP(dst=args['destination_ip'], src=args['source_ip'], proto=17, len=240, tos=184)  # DSCP EF (46)
-        
-    base_packet = base_packet/UDP(sport=source_port, dport=args['destination_port'], len=220)
+        base_packet = IP(dst=host, src=source_ip, proto=17, len=240, tos=184)  # DSCP EF (46)
+
+    base_packet = base_packet/UDP(sport=source_port, dport=int(port), len=220)
 
     # Sending loop
     start_time = time.time()
+    sent = 0
     for i in range(1, count + 1):
+        if abort_event is not None and abort_event.is_set():
+            break
         packet = base_packet/RTP(version=2, payload_type=8, sequence=i, sourcesync=1, timestamp=int(time.time()))
         packet = packet/Raw(load=final_payload)
 
@@ -204,6 +165,7 @@ if __name__ == "__main__":
 
         # Send using Layer 3 (Standard IP)
         send(packet, verbose=False)
+        sent = i
         time.sleep(0.03) # ~33 packets per second (Standard G.711 / 30ms)
 
     # Wait a bit for the last echo to return
@@ -214,16 +176,16 @@ if __name__ == "__main__":
 
     # Final metrics
     received_count = len(metrics.received_seqs)
-    loss = ((count - received_count) / count) * 100 if count > 0 else 0
+    loss = ((sent - received_count) / sent) * 100 if sent > 0 else 0
     loss = max(0, min(100, loss)) # Clamp 0-100
     avg_rtt = sum(metrics.rtts) / len(metrics.rtts) if metrics.rtts else 0
     max_rtt = max(metrics.rtts) if metrics.rtts else 0
     jitter = metrics.jitter * 1000 # ms
 
-    # Formatting for summary log (Orchestrator will pick this up)
-    summary = {
-        "call_id": args['call_id'],
-        "sent": count,
+    # Formatting for summary log
+    return {
+        "call_id": call_id,
+        "sent": sent,
         "received": received_count,
         "loss_pct": round(loss, 2),
         "avg_rtt_ms": round(avg_rtt, 2),
@@ -232,5 +194,81 @@ if __name__ == "__main__":
         "duration": round(time.time() - start_time, 2)
     }
 
+# Abort event of the orchestrator, set in each call worker process by init_call_worker
+_worker_abort = None
+
+def init_call_worker(abort_event):
+    """
+    ProcessPoolExecutor initializer for the voice orchestrator's call workers.
+
+    Keeps the parent's multiprocessing.Event for run_call_in_worker and leaves
+    shutdown signals to the parent, which aborts calls through that event.
+    """
+    global _worker_abort
+    _worker_abort = abort_event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+def run_call_in_worker(*args, **kwargs):
+    """run_call in a pool worker process, aborted by the orchestrator's event."""
+    return run_call(*args, abort_event=_worker_abort, **kwargs)
+
+if __name__ == "__main__":
+    # parse arguments
+    parser = argparse.ArgumentParser()
+
+    # Allow Controller modification and debug level sets.
+    binding_group = parser.add_argument_group('Binding', 'These options change how traffic is bound/sent')
+    binding_group.add_argument("--destination-ip", "-dip", "-D", help="Destination IP for the RTP stream",
+                               type=str, required=True)
+    binding_group.add_argument("--destination-port", "-dport",
+                               help="Destination port for the RTP stream (Default 6100)", type=int,
+                               default=6100)
+    binding_group.add_argument("--source-ip", "-sip", "-S", help="Source IP for the RTP stream. If not specified, "
+                                                                 "the kernel will auto-select.",
+                               type=str, default=None)
+    binding_group.add_argument("--source-port", "-sport",
+                               help="Source port for the RTP stream. If not specified, "
+                                    "the kernel will auto-select.", type=int,
+                               default=0)
+    binding_group.add_argument("--source-interface",
+                               help="Source interface RTP stream. (Ignored for L3 send)", type=str,
+                               default=None)
+    options_group = parser.add_argument_group('Options', "Configurable options for traffic sending.")
+    options_group.add_argument("--min-count", "-C", help="Minimum number of packets to send (Default 4500)",
+                               type=int, default=4500)
+    options_group.add_argument("--max-count", help="Maximum number of packets to send (Default 90000)",
+                               type=int, default=90000)
+    options_group.add_argument("--call-id", help="Call ID to embed in the payload for tracking",
+                               type=str, default="NONE")
+
+#   args = vars(parser.parse_args())
+
+#   # pull args for count.
+#   min_count = args['min_count']
+#   max_count = args['max_count']
+#   count = random.randrange(min_count, max_count)
+    
+#   source_port = args['source_port']
+#   if source_port == 0:
+#       # Use a random port but fixed for this entire call session
+#       source_port = random.randrange(10000, 65535)
+
+    args = vars(parser.parse_args())
+
+    # pull args for count.
+    min_count = args['min_count']
+    max_count = args['max_count']
+    count = random.randrange(min_count, max_count)
+
+    timestamp = time.strftime('%H:%M:%S')
+    print(f"[{timestamp}] [{args['call_id']}] 🚀 Executing: python3 rtp.py -D {args['destination_ip']} -dport {args['destination_port']} --min-count {args['min_count']} --max-count {args['max_count']} --source-interface {args['source_interface']} --call-id {args['call_id']}")
+    print(f"[{timestamp}] [{args['call_id']}] 📞 CALL STARTED: {args['destination_ip']}:{args['destination_port']} | G.711-ulaw | {int(args['min_count'] * 0.03)}s")
+
+    summary = run_call(args['destination_ip'], args['destination_port'], count,
+                       interface=args['source_interface'], call_id=args['call_id'],
+                       source_ip=args['source_ip'], source_port=args['source_port'])
+
+    # Summary line for log scrapers
     print(f"RESULT: {json.dumps(summary)}")
     print(f"Call {args['call_id']} finished.")
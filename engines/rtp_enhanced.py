@@ -21,6 +21,11 @@ from scapy.layers.rtp import RTP
 from scapy.packet import Raw
 from scapy.sendrecv import send
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Codec specifications for realistic audio simulation
 CODEC_SPECS = {
     'G.711-ulaw': {
@@ -104,21 +109,23 @@ class VADSimulator:
     def __init__(self, talk_spurt_duration=1.8, silence_duration=1.2):
         self.talk_spurt_duration = talk_spurt_duration  # Average talk duration (s)
         self.silence_duration = silence_duration  # Average silence duration (s)
+        # Exponential rates (1/mean) per state, computed once
+        self.rates = {
+            'talking': 1.0 / talk_spurt_duration,
+            'silence': 1.0 / silence_duration
+        }
+        self._expovariate = random.expovariate
         self.current_state = 'talking'
-        self.state_start_time = time.time()
+        self.state_start_time = time.perf_counter()
         self.next_transition = self._calculate_next_transition()
 
     def _calculate_next_transition(self):
         """Calculate when to switch states using exponential distribution"""
-        if self.current_state == 'talking':
-            duration = random.expovariate(1.0 / self.talk_spurt_duration)
-        else:
-            duration = random.expovariate(1.0 / self.silence_duration)
-        return self.state_start_time + duration
+        return self.state_start_time + self._expovariate(self.rates[self.current_state])
 
     def is_talking(self):
         """Check if currently in talk spurt"""
-        now = time.time()
+        now = time.perf_counter()
         if now >= self.next_transition:
             # Switch states
             self.current_state = 'silence' if self.current_state == 'talking' else 'talking'
@@ -127,55 +134,66 @@ class VADSimulator:
         return self.current_state == 'talking'
 
 
-def generate_audio_payload(codec_name, sequence, payload_size):
-    """Generate codec-appropriate payload with audio-like characteristics"""
+def _g711_payload(sequence, payload_size):
+    """μ-law/A-law: Simulate speech-like amplitude variations"""
+    # Use sine wave with varying amplitude to simulate speech envelope
+    amplitude_variation = abs(math.sin(sequence * 0.05)) * 0.7 + 0.3
+    payload = bytearray(payload_size)
+    for i in range(payload_size):
+        # μ-law compressed values cluster around 0xFF and 0x7F
+        base_value = 0xFF if (sequence + i) % 2 == 0 else 0x7F
+        variation = int(random.gauss(0, 15) * amplitude_variation)
+        payload[i] = max(0, min(255, base_value + variation))
+    return bytes(payload)
 
-    if codec_name.startswith('G.711'):
-        # μ-law/A-law: Simulate speech-like amplitude variations
-        # Use sine wave with varying amplitude to simulate speech envelope
-        amplitude_variation = abs(math.sin(sequence * 0.05)) * 0.7 + 0.3
-        payload = bytearray(payload_size)
-        for i in range(payload_size):
-            # μ-law compressed values cluster around 0xFF and 0x7F
-            base_value = 0xFF if (sequence + i) % 2 == 0 else 0x7F
-            variation = int(random.gauss(0, 15) * amplitude_variation)
-            payload[i] = max(0, min(255, base_value + variation))
-        return bytes(payload)
-
-    elif codec_name == 'G.729':
-        # G.729: Compressed CELP format with structured frames
-        payload = bytearray(payload_size)
-        # First byte typically has higher entropy (LSP indices)
-        payload[0] = random.randint(0x80, 0xFF)
-        # Remaining bytes have moderate variation
-        for i in range(1, payload_size):
-            payload[i] = random.randint(0x20, 0xDF)
-        return bytes(payload)
-
-    elif codec_name == 'Opus':
-        # Opus: Variable bitrate with TOC byte
-        payload = bytearray(payload_size)
-        # First byte is TOC (Table of Contents)
-        payload[0] = 0x78  # Silk-only, 20ms, stereo
-        # Rest is compressed data
-        for i in range(1, payload_size):
-            payload[i] = random.randint(0x00, 0xFF)
-        return bytes(payload)
 
-    else:
-        # Fallback: Random with speech-like byte distribution
-        return bytes([random.randint(0x40, 0xBF) for _ in range(payload_size)])
+# Byte translation tables mapping a uniform random byte into a codec's value range
+_G729_BYTE_TABLE = bytes(0x20 + (b * 0xC0 >> 8) for b in range(256))  # 0x20-0xDF
+_GENERIC_BYTE_TABLE = bytes(0x40 + (b >> 1) for b in range(256))  # 0x40-0xBF
+
+
+def _g729_payload(sequence, payload_size):
+    """G.729: Compressed CELP format with structured frames"""
+    # First byte typically has higher entropy (LSP indices)
+    # Remaining bytes have moderate variation
+    return bytes((random.randint(0x80, 0xFF),)) + os.urandom(payload_size - 1).translate(_G729_BYTE_TABLE)
+
+
+def _opus_payload(sequence, payload_size):
+    """Opus: Variable bitrate with TOC byte"""
+    # First byte is TOC (Table of Contents): Silk-only, 20ms, stereo
+    # Rest is compressed data
+    return b'\x78' + os.urandom(payload_size - 1)
+
+
+def _generic_payload(sequence, payload_size):
+    """Fallback: Random with speech-like byte distribution"""
+    return os.urandom(payload_size).translate(_GENERIC_BYTE_TABLE)
+
+
+# Payload generator per codec, resolved once per call instead of per packet
+PAYLOAD_GENERATORS = {
+    'G.711-ulaw': _g711_payload,
+    'G.711-alaw': _g711_payload,
+    'G.729': _g729_payload,
+    'Opus': _opus_payload,
+}
+
+
+def get_payload_generator(codec_name):
+    """Return the specialized payload generator for a codec"""
+    return PAYLOAD_GENERATORS.get(codec_name, _generic_payload)
+
+
+def generate_audio_payload(codec_name, sequence, payload_size):
+    """Generate codec-appropriate payload with audio-like characteristics"""
+    return get_payload_generator(codec_name)(sequence, payload_size)
 
 
 def generate_comfort_noise(size=13):
     """Generate RFC 3389 Comfort Noise payload"""
-    payload = bytearray(size)
-    # First byte is noise level
-    payload[0] = random.randint(0x30, 0x50)  # -40 to -50 dBov
-    # Rest is reflection coefficients
-    for i in range(1, size):
-        payload[i] = random.randint(0x00, 0xFF)
-    return bytes(payload)
+    # First byte is noise level (-40 to -50 dBov), rest is reflection coefficients
+    return bytes((random.randint(0x30, 0x50),)) + os.urandom(size - 1)
 
 
 def calculate_mos(avg_rtt, jitter, loss_pct, ie_factor=0):
@@ -208,39 +226,32 @@ def calculate_mos(avg_rtt, jitter, loss_pct, ie_factor=0):
     return round(max(1.0, min(4.5, mos)), 2)
 
 
+# RTCP Sender Report (RFC 3550): V=2, P=0, RC=0, PT=200 (SR), length=6 (28 bytes / 4 - 1)
+NTP_EPOCH_OFFSET = 2208988800  # Seconds between 1900 (NTP) and 1970 (Unix) epochs
+_RTCP_SR = struct.Struct('!BBHIIIIII')
+_RTCP_SR_FIRST_BYTE = 2 << 6
+_rtcp_buf = bytearray(_RTCP_SR.size)
+
+
 def send_rtcp_sr(sock, ssrc, packets_sent, octets_sent, dest_ip, dest_port):
     """Send RTCP Sender Report (RFC 3550)"""
     try:
-        # RTCP SR packet format
-        version = 2
-        padding = 0
-        reception_report_count = 0
-        packet_type = 200  # SR
-        length = 6  # 28 bytes / 4 - 1
+        now = time.time()
 
         # NTP timestamp (seconds since 1900)
-        ntp_timestamp = int((time.time() + 2208988800) * (2**32))
-        ntp_msw = (ntp_timestamp >> 32) & 0xFFFFFFFF
-        ntp_lsw = ntp_timestamp & 0xFFFFFFFF
-        rtp_timestamp = int(time.time() * 8000) & 0xFFFFFFFF
-
-        rtcp_header = struct.pack('!BBHI',
-                                  (version << 6) | (padding << 5) | reception_report_count,
-                                  packet_type,
-                                  length,
-                                  ssrc)
-
-        sender_info = struct.pack('!IIIII',
-                                  ntp_msw,
-                                  ntp_lsw,
-                                  rtp_timestamp,
-                                  packets_sent,
-                                  octets_sent)
-
-        rtcp_packet = rtcp_header + sender_info
+        ntp_timestamp = int((now + NTP_EPOCH_OFFSET) * (2**32))
+        rtp_timestamp = int(now * 8000) & 0xFFFFFFFF
+
+        _RTCP_SR.pack_into(_rtcp_buf, 0,
+                           _RTCP_SR_FIRST_BYTE, 200, 6, ssrc,
+                           (ntp_timestamp >> 32) & 0xFFFFFFFF,
+                           ntp_timestamp & 0xFFFFFFFF,
+                           rtp_timestamp,
+                           packets_sent & 0xFFFFFFFF,
+                           octets_sent & 0xFFFFFFFF)
 
         # Send to RTCP port (RTP port + 1)
-        sock.sendto(rtcp_packet, (dest_ip, dest_port + 1))
+        sock.sendto(memoryview(_rtcp_buf), (dest_ip, dest_port + 1))
     except Exception as e:
         pass  # Silently ignore RTCP errors
 
@@ -266,8 +277,9 @@ def receiver_thread(sock, metrics, stop_event):
             data, addr = sock.recvfrom(2048)
             receive_time = time.perf_counter()
 
-            # Basic RTP decoding to get sequence (bytes 2-3)
-            if len(data) >= 12:
+            # Basic RTP decoding to get sequence (bytes 2-3); echoed RTCP (PT 200-204,
+            # RFC 5761 demux) shares this port and would read its length field as seq
+            if len(data) >= 12 and data[0] >> 6 == 2 and not 200 <= data[1] <= 204:
                 seq = (data[2] << 8) + data[3]
                 metrics.record_receive(seq, receive_time)
         except socket.timeout:
@@ -357,18 +369,23 @@ if __name__ == "__main__":
         print(f"Warning: Could not bind receiver socket to port {source_port}: {e}")
         # We continue anyway, but RTT/Loss metrics will be 0/100%
 
+    # RTCP reports are sent from the same socket; a larger send buffer absorbs bursts
+    try:
+        recv_sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4 * 1024 * 1024)
+    except OSError:
+        pass
+
     # Start receiver thread
     recv_thread = threading.Thread(target=receiver_thread, args=(recv_sock, metrics, stop_event))
     recv_thread.daemon = True
     recv_thread.start()
 
-    # Start RTCP thread if enabled
-    rtcp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    # Start RTCP thread if enabled (shares the bound receiver socket)
     rtp_ssrc = random.randint(0, 0xFFFFFFFF)  # Random SSRC per call
 
     if args['enable_rtcp']:
         rtcp_t = threading.Thread(target=rtcp_thread, 
-                                   args=(rtcp_sock, rtp_ssrc, metrics, 
+                                   args=(recv_sock, rtp_ssrc, metrics, 
                                          args['destination_ip'], args['destination_port'], 
                                          stop_event))
         rtcp_t.daemon = True
@@ -400,6 +417,7 @@ if __name__ == "__main__":
     ptime = codec_spec['ptime'] / 1000.0  # Convert to seconds
     timestamp_increment = codec_spec['sample_rate'] * codec_spec['ptime'] // 1000
     payload_size = codec_spec['payload_size']
+    generate_payload = get_payload_generator(codec_name)
 
     # Sending loop
     start_time = time.time()
@@ -417,7 +435,7 @@ if __name__ == "__main__":
             rtp.payload_type = 13  # CN payload type
         else:
             # Generate audio payload
-            payload = generate_audio_payload(codec_name, i, payload_size)
+            payload = generate_payload(i, payload_size)
             rtp = rtp_base.copy()
             rtp.payload_type = codec_spec['payload_type']
 
@@ -447,7 +465,6 @@ if __name__ == "__main__":
     stop_event.set()
     recv_thread.join(timeout=1.0)
     recv_sock.close()
-    rtcp_sock.close()
 
     # Calculate final metrics
     received_count = len(metrics.received_seqs)
@@ -479,7 +496,8 @@ if __name__ == "__main__":
         "rtcp_enabled": args['enable_rtcp']
     }
 
-    print(f"RESULT: {json.dumps(summary)}")
+    result_json = orjson.dumps(summary).decode() if orjson else json.dumps(summary)
+    print(f"RESULT: {result_json}")
     timestamp = time.strftime('%H:%M:%S')
     print(f"[{timestamp}] [{args['call_id']}] ✅ Call finished. MOS: {mos} | Loss: {loss:.2f}% | "
           f"RTT: {avg_rtt:.2f}ms | Jitter: {jitter:.2f}ms")
@@ -5,13 +5,20 @@ import subprocess
 import json
 import os
 import threading
+from collections import deque
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 class SRTMetrics:
     def __init__(self, target, interval_s):
         self.target = target
         self.interval = interval_s
-        self.results = []
-        self.lock = threading.Lock()
+        # Single producer (probe loop); deque.append is atomic, so no lock is needed
+        self.results = deque(maxlen=100)
+        self.latest = None
         self.stop_event = threading.Event()
 
     def run_probe(self):
@@ -28,7 +35,7 @@ class SRTMetrics:
         
         try:
             output = subprocess.check_output(cmd, stderr=subprocess.STDOUT).decode('utf-8')
-            data = json.loads(output)
+            data = orjson.loads(output) if orjson else json.loads(output)
             
             rtt_ms = round(data['rtt'] * 1000, 2)
             ttfb_ms = round(data['ttfb'] * 1000, 2)
@@ -46,25 +53,42 @@ class SRTMetrics:
             # Print for transparency in dashboard logs
             print(f"🐌 [SRT] Probe Result: Target={self.target} | RTT={rtt_ms}ms | SRT={srt_ms}ms | Total={total_ms}ms | Code={data['code']}", flush=True)
 
-            with self.lock:
-                self.results.append(result)
-                if len(self.results) > 100:
-                    self.results.pop(0)
+            self.results.append(result)
             
             return result
         except Exception as e:
             return {"error": str(e)}
 
+    def write_stats(self, stats_file, latest):
+        # Write to a temp file and swap it in so readers never see partial JSON
+        tmp_file = stats_file + ".tmp"
+        stats = {"target": self.target, "latest": latest, "history": list(self.results)}
+        if orjson:
+            with open(tmp_file, 'wb') as f:
+                f.write(orjson.dumps(stats))
+        else:
+            with open(tmp_file, 'w') as f:
+                json.dump(stats, f, separators=(',', ':'))
+        os.replace(tmp_file, stats_file)
+
+    def writer_loop(self, stats_file):
+        # Persist snapshots on its own cadence so disk latency never delays probes
+        written = None
+        while not self.stop_event.wait(self.interval):
+            latest = self.latest
+            if latest is None or latest is written:
+                continue
+            try:
+                self.write_stats(stats_file, latest)
+                written = latest
+            except: pass
+
     def start(self, stats_file):
+        writer = threading.Thread(target=self.writer_loop, args=(stats_file,), daemon=True)
+        writer.start()
+
         while not self.stop_event.is_set():
-            res = self.run_probe()
-            
-            with self.lock:
-                try:
-                    with open(stats_file, 'w') as f:
-                        json.dump({"target": self.target, "latest": res, "history": self.results}, f)
-                except: pass
-            
+            self.latest = self.run_probe()
             time.sleep(self.interval)
 
 if __name__ == "__main__":
@@ -1,18 +1,34 @@
+import atexit
+import copy
+import functools
+import itertools
 import json
+import multiprocessing
 import os
 import time
 import subprocess
 import random
 import signal
+import socket
 import sys
+from concurrent import futures
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+import rtp
+
 # Configuration paths (aligned with Docker volumes)
 CONFIG_DIR = os.getenv('CONFIG_DIR', '/app/config')
 LOG_DIR = os.getenv('LOG_DIR', '/var/log/sdwan-traffic-gen')
 VERSION_FILE = '/app/VERSION'  # Optional
 DEBUG_MODE = os.getenv('DEBUG', 'false').lower() == 'true'
 
+@functools.lru_cache(maxsize=1)
 def get_version():
     try:
         if os.path.exists(VERSION_FILE):
@@ -24,26 +40,77 @@ def get_version():
 VOICE_CONFIG_FILE = os.path.join(CONFIG_DIR, 'voice-config.json')
 STATS_FILE = os.path.join(LOG_DIR, 'voice-stats.jsonl')
 active_calls = []
+# One worker process per simultaneous call (rtp.run_call), so calls never share
+# a GIL and keep their own send pacing and receive timestamps.
+# Sized to max_simultaneous_calls by get_call_executor.
+call_executor = None
+call_executor_size = 0
+# Set on shutdown so running calls stop sending
+call_abort = multiprocessing.Event()
 current_session_id = str(int(time.time()))
-def get_next_call_id():
-    config = load_voice_config()
-    state = config.get('state', {})
-    counter = state.get('counter', 0)
-    
-    # Implementation of cyclic counter (0-9999) for deterministic port mapping
-    counter = (counter + 1) % 10000
-    
-    # Update state and save back to config
-    state['counter'] = counter
-    config['state'] = state
-    
+# Persistent buffered handle for STATS_FILE, flushed in batches
+STATS_FLUSH_INTERVAL = 1.0
+stats_fp = None
+last_stats_flush = 0.0
+# path -> ((st_mtime_ns, st_size), parsed content)
+_file_cache = {}
+
+def cached_read(path, parser, default=None):
+    # Re-parse a file only when its mtime or size changed since the last read
     try:
-        with open(VOICE_CONFIG_FILE, 'w') as f:
-            json.dump(config, f, indent=2)
+        st = os.stat(path)
+    except OSError:
+        _file_cache.pop(path, None)
+        return default
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _file_cache.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    with open(path, 'r') as f:
+        parsed = parser(f)
+    _file_cache[path] = (key, parsed)
+    return parsed
+
+# Call counter lives in memory and is persisted to voice-config.json periodically
+COUNTER_FLUSH_INTERVAL = 30.0
+call_counter = None
+persisted_counter = None
+last_counter_flush = 0.0
+
+def write_voice_config(config):
+    # Write to a temp file and swap it in so readers never see partial JSON
+    tmp_file = VOICE_CONFIG_FILE + '.tmp'
+    with open(tmp_file, 'w') as f:
+        json.dump(config, f, indent=2)
+    os.replace(tmp_file, VOICE_CONFIG_FILE)
+
+def save_counter(force=False):
+    global persisted_counter, last_counter_flush
+    if not force and time.monotonic() - last_counter_flush < COUNTER_FLUSH_INTERVAL:
+        return
+    last_counter_flush = time.monotonic()
+    if call_counter is None or call_counter == persisted_counter:
+        return
+    config = copy.deepcopy(load_voice_config())
+    config.setdefault('state', {})['counter'] = call_counter
+    try:
+        write_voice_config(config)
+        persisted_counter = call_counter
     except Exception as e:
         if DEBUG_MODE: print(f"⚠️ Failed to save counter: {e}")
+
+def get_next_call_id():
+    global call_counter, persisted_counter
+    stored = load_voice_config().get('state', {}).get('counter', 0)
+    if call_counter is None or stored != persisted_counter:
+        # First call, or the counter was changed externally (e.g. reset from the UI)
+        call_counter = persisted_counter = stored
+
+    # Implementation of cyclic counter (0-9999) for deterministic port mapping
+    call_counter = (call_counter + 1) % 10000
+    save_counter()
     
-    return f"CALL-{counter:04d}"
+    return f"CALL-{call_counter:04d}"
 
 def print_banner():
     version = get_version()
@@ -55,24 +122,26 @@ def print_banner():
     sys.stdout.flush()
 
 def load_voice_config():
-    if os.path.exists(VOICE_CONFIG_FILE):
-        try:
-            with open(VOICE_CONFIG_FILE, 'r') as f:
-                return json.load(f)
-        except: pass
+    # Shared cached object: callers that modify the config must copy it first
+    try:
+        return cached_read(VOICE_CONFIG_FILE, json.load, {})
+    except: pass
     return {}
 
+def parse_interfaces(f):
+    content = f.read().strip()
+    if content and not content.startswith('#'):
+        return content.split('\n')[0].strip()
+    return None
+
 def load_control():
     # Primary interface discovery
     default_iface = 'eth0'
     try:
-        iface_file = os.path.join(CONFIG_DIR, 'interfaces.txt')
-        if os.path.exists(iface_file):
-            with open(iface_file, 'r') as f:
-                content = f.read().strip()
-                if content and not content.startswith('#'):
-                    default_iface = content.split('\n')[0].strip()
-                    if DEBUG_MODE: print(f"📡 [VOICE] System Interface: {default_iface} (Source: interfaces.txt)")
+        iface = cached_read(os.path.join(CONFIG_DIR, 'interfaces.txt'), parse_interfaces)
+        if iface:
+            default_iface = iface
+            if DEBUG_MODE: print(f"📡 [VOICE] System Interface: {default_iface} (Source: interfaces.txt)")
         
         # Smart auto-detection fallback if interfaces.txt is empty or missing
         if default_iface == 'eth0':
@@ -87,7 +156,7 @@ def load_control():
     except: pass
 
     config = load_voice_config()
-    data = config.get('control', {})
+    data = dict(config.get('control', {}))
     
     # If explicitly set to eth0 but we found something else in interfaces.txt, prioritize interfaces.txt
     if data.get('interface') == 'eth0' and default_iface != 'eth0':
@@ -101,9 +170,22 @@ def load_control():
     
     return data
 
+# (servers list, cumulative weights) for the currently cached server list
+_server_weights = (None, [])
+
 def load_servers():
+    global _server_weights
     config = load_voice_config()
-    return config.get('servers', [])
+    servers = config.get('servers', [])
+    # Rebuild cumulative weights only when the cached server list was re-parsed
+    if _server_weights[0] is not servers:
+        _server_weights = (servers, list(itertools.accumulate(s['weight'] for s in servers)))
+    return _server_weights
+
+# E-model constants
+R_MAX = 94.2
+LOSS_SCALE = 2.5
+MOS_MAX = 4.4
 
 def calculate_mos(latency_ms, jitter_ms, loss_pct):
     """
@@ -113,29 +195,55 @@ def calculate_mos(latency_ms, jitter_ms, loss_pct):
     Ie: Equipment impairment (loss/jitter)
     """
     # 1. Effective latency calculation (including jitter buffer approximation)
-    effective_latency = latency_ms + (jitter_ms * 2) + 10
+    effective_latency = latency_ms + jitter_ms * 2 + 10
     
-    # 2. Delay Impairment (Id)
-    if effective_latency <= 160:
-        id_impairment = effective_latency / 40
-    else:
-        id_impairment = (effective_latency - 120) / 10
-        
-    # 3. Equipment Impairment (Ie) - Loss
+    # 2. Delay Impairment (Id) + 3. Equipment Impairment (Ie) - Loss
     # For G.711 (PLC), loss impact is high
-    ie_impairment = loss_pct * 2.5
-    
-    # 4. Final R-factor
-    r_factor = 94.2 - id_impairment - ie_impairment
+    id_impairment = effective_latency * 0.025 if effective_latency <= 160 else (effective_latency - 120) * 0.1
     
-    # Clamp R-factor
-    r_factor = max(0, min(94.2, r_factor))
+    # 4. Final R-factor, clamped to [0, R_MAX]
+    r_factor = R_MAX - id_impairment - loss_pct * LOSS_SCALE
+    if r_factor < 0:
+        r_factor = 0
+    elif r_factor > R_MAX:
+        r_factor = R_MAX
     
     # 5. MOS Calculation
-    if r_factor < 0: return 1.0
-    mos = 1 + (0.035 * r_factor) + (0.000007 * r_factor * (r_factor - 60) * (100 - r_factor))
+    mos = 1 + r_factor * (0.035 + 0.000007 * (r_factor - 60) * (100 - r_factor))
     
-    return round(max(1.0, min(4.4, mos)), 2)
+    return round(max(1.0, min(MOS_MAX, mos)), 2)
+
+# (epoch second, ISO-8601 string) reused for every event within the same second
+_event_ts = (0, "")
+
+def event_timestamp():
+    global _event_ts
+    now = int(time.time())
+    if now != _event_ts[0]:
+        _event_ts = (now, datetime.fromtimestamp(now).isoformat())
+    return _event_ts[1]
+
+def open_stats_log():
+    global stats_fp
+    stats_fp = open(STATS_FILE, 'ab', buffering=1 << 16)
+
+def flush_stats():
+    global last_stats_flush
+    if stats_fp is not None:
+        try:
+            stats_fp.flush()
+        except Exception as e:
+            print(f"Error flushing call log: {e}")
+    last_stats_flush = time.monotonic()
+
+def close_stats_log():
+    global stats_fp
+    if stats_fp is not None:
+        flush_stats()
+        stats_fp.close()
+        stats_fp = None
+
+atexit.register(close_stats_log)
 
 def log_call(event, call_info):
     try:
@@ -149,43 +257,86 @@ def log_call(event, call_info):
             call_info["mos_score"] = mos
 
         log_entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": event_timestamp(),
             "event": event,
             "session_id": current_session_id,
             **call_info
         }
-        with open(STATS_FILE, 'a') as f:
-            f.write(json.dumps(log_entry) + '\n')
-            f.flush()
+        if stats_fp is None:
+            open_stats_log()
+        if orjson:
+            stats_fp.write(orjson.dumps(log_entry))
+            stats_fp.write(b'\n')
+        else:
+            stats_fp.write((json.dumps(log_entry) + '\n').encode())
+        if time.monotonic() - last_stats_flush >= STATS_FLUSH_INTERVAL:
+            flush_stats()
     except Exception as e:
         print(f"Error logging call: {e}")
 
-def pick_server(servers):
+def pick_server(servers, cum_weights):
     if not servers:
         return None
-    total_weight = sum(s['weight'] for s in servers)
-    r = random.uniform(0, total_weight)
-    upto = 0
-    for s in servers:
-        if upto + s['weight'] >= r:
-            return s
-        upto += s['weight']
-    return servers[0]
-
-def check_reachability(ip):
+    if cum_weights[-1] <= 0:
+        return servers[0]
+    return random.choices(servers, cum_weights=cum_weights, k=1)[0]
+
+# host -> (monotonic deadline, reachable)
+REACH_TTL_OK = 60
+REACH_TTL_FAIL = 10
+_reach_cache = {}
+
+def check_reachability(host, port):
+    now = time.monotonic()
+    cached = _reach_cache.get(host)
+    if cached is not None and now < cached[0]:
+        return cached[1]
     try:
-        # Quick ping check (1 packet, 1 second timeout)
-        subprocess.check_output(["ping", "-c", "1", "-W", "1", ip], stderr=subprocess.STDOUT)
-        return True
-    except subprocess.CalledProcessError:
-        return False
+        # TCP probe to the RTP port (1 second timeout). A refused connection still
+        # proves the host answered; only timeouts and routing errors count as down.
+        socket.create_connection((host, int(port)), timeout=1).close()
+        reachable = True
+    except ConnectionRefusedError:
+        reachable = True
+    except (OSError, ValueError):
+        reachable = False
+    _reach_cache[host] = (now + (REACH_TTL_OK if reachable else REACH_TTL_FAIL), reachable)
+    return reachable
+
+# Log line for a call start; filled by % substitution instead of rebuilt per call
+CALL_EXEC_TEMPLATE = "[%s] [%s] 🚀 Executing: rtp.run_call -D %s -dport %d --count %d --source-interface %s --call-id %s"
+# (target, duration) -> (host, port, num_packets)
+_call_plans = {}
+
+def get_call_plan(server):
+    # Parse target and derive the packet count once per server entry
+    key = (server['target'], server['duration'])
+    plan = _call_plans.get(key)
+    if plan is None:
+        host, port = server['target'].split(':')
+        # Calculate packet count based on duration and 0.03s sleep in rtp.py
+        plan = (host, int(port), int(server['duration'] / 0.03))
+        _call_plans[key] = plan
+    return plan
 
-def start_call(server, interface):
+def get_call_executor(size):
+    # Rebuild the pool when max_simultaneous_calls changes; calls already running
+    # in the old pool finish in their own workers
+    global call_executor, call_executor_size
+    if call_executor is None or size != call_executor_size:
+        if call_executor is not None:
+            call_executor.shutdown(wait=False)
+        call_executor = futures.ProcessPoolExecutor(max_workers=size, initializer=rtp.init_call_worker,
+                                                    initargs=(call_abort,))
+        call_executor_size = size
+    return call_executor
+
+def start_call(server, interface, max_calls):
     call_id = get_next_call_id()
-    host, port = server['target'].split(':')
+    host, port, num_packets = get_call_plan(server)
     
     # Pre-flight check: is the target reachable?
-    if not check_reachability(host):
+    if not check_reachability(host, port):
         timestamp = time.strftime('%H:%M:%S')
         print(f"[{timestamp}] [{call_id}] ⚠️  Target {host} is unreachable. Skipping call.")
         sys.stdout.flush()
@@ -198,31 +349,17 @@ def start_call(server, interface):
         })
         return None
 
-    # Calculate packet count based on duration and 0.03s sleep in rtp.py
-    num_packets = int(server['duration'] / 0.03)
-    
-    cmd = [
-        "python3", "rtp.py",
-        "-D", host,
-        "-dport", port,
-        "--min-count", str(num_packets),
-        "--max-count", str(num_packets + 1),
-        "--source-interface", interface,
-        "--call-id", call_id
-    ]
-    
-    timestamp = time.strftime('%H:%M:%S')
-    print(f"[{timestamp}] [{call_id}] 🚀 Executing: {' '.join(cmd)}")
-    sys.stdout.flush()
-    
+    global call_executor
     try:
-        env = os.environ.copy()
-        env["PYTHONUNBUFFERED"] = "1"
-        # Capture stdout for QoS data
-        proc = subprocess.Popen(cmd, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        # main() only starts a call while fewer than max_calls are active and the
+        # pool has max_calls workers, so the call begins as soon as it is submitted
+        future = get_call_executor(max_calls).submit(rtp.run_call_in_worker, host, port, num_packets,
+                                                     interface=interface, call_id=call_id)
+        timestamp = time.strftime('%H:%M:%S')
+        print(CALL_EXEC_TEMPLATE % (timestamp, call_id, host, port, num_packets, interface, call_id))
+        sys.stdout.flush()
         call_info = {
             "call_id": call_id,
-            "pid": proc.pid,
             "target": server['target'],
             "codec": server['codec'],
             "duration": server['duration']
@@ -230,18 +367,61 @@ def start_call(server, interface):
         timestamp = time.strftime('%H:%M:%S')
         log_call("start", call_info)
         print(f"[{timestamp}] [{call_id}] 📞 CALL STARTED: {server['target']} | {server['codec']} | {server['duration']}s", flush=True)
-        return {"proc": proc, "info": call_info}
+        return {"future": future, "info": call_info}
+    except BrokenProcessPool as e:
+        # A worker died abruptly; start over with a fresh pool on the next call
+        print(f"Failed to start rtp call: {e}")
+        call_executor = None
+        return None
     except Exception as e:
-        print(f"Failed to start rtp.py: {e}")
+        print(f"Failed to start rtp call: {e}")
         return None
 
+def finish_call(call):
+    # Capture QoS metrics returned by rtp.run_call
+    qos_data = {}
+    try:
+        qos_data = call['future'].result()
+    except Exception as e:
+        print(f"[{call['info']['call_id']}] RTP call failed: {e}")
+
+    # Merge QoS data into info for logging
+    final_info = {**call['info'], **qos_data}
+    log_call("end", final_info)
+
+    timestamp = time.strftime('%H:%M:%S')
+    print(f"[{timestamp}] [{call['info']['call_id']}] ✅ CALL ENDED: {call['info']['target']}")
+    sys.stdout.flush()
+
+def reap_calls(finished):
+    # Log finished calls, then drop them from active_calls in a single pass
+    for call in finished:
+        finish_call(call)
+    finished_ids = {id(call) for call in finished}
+    active_calls[:] = [call for call in active_calls if id(call) not in finished_ids]
+
+def wait_for_calls(timeout):
+    # Sleep until the next iteration, finishing calls the moment they complete
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        if not active_calls:
+            time.sleep(remaining)
+            return
+        by_future = {call['future']: call for call in active_calls}
+        done, _ = futures.wait(by_future, timeout=remaining, return_when=futures.FIRST_COMPLETED)
+        reap_calls([by_future[future] for future in done])
+        flush_stats()
+
 def signal_handler(sig, frame):
     print("Shutting down voice orchestrator...")
-    for call in active_calls:
-        try:
-            call['proc'].terminate()
-        except:
-            pass
+    call_abort.set()
+    if call_executor is not None:
+        call_executor.shutdown(wait=False)
+    save_counter(force=True)
+    close_stats_log()
     sys.exit(0)
 
 signal.signal(signal.SIGINT, signal_handler)
@@ -255,18 +435,16 @@ def main():
     print("🧹 Cleaning slate for new session...")
     try:
         # 1. Reset Counter in unified config
-        config = load_voice_config()
+        config = copy.deepcopy(load_voice_config())
         if 'state' not in config: config['state'] = {}
         config['state']['counter'] = 0
-        with open(VOICE_CONFIG_FILE, 'w') as f:
-            json.dump(config, f, indent=2)
+        write_voice_config(config)
         # 2. Disable simulation by default
         try:
-            config = load_voice_config()
+            config = copy.deepcopy(load_voice_config())
             if 'control' in config:
                 config['control']['enabled'] = False
-                with open(VOICE_CONFIG_FILE, 'w') as f:
-                    json.dump(config, f, indent=2)
+                write_voice_config(config)
         except Exception as e:
             print(f"Warning during config reset: {e}")
 
@@ -276,6 +454,7 @@ def main():
                 f.write("")
         except Exception as e:
             print(f"Warning during log clearing: {e}")
+        open_stats_log()
     except Exception as e:
         print(f"Warning during startup cleanup: {e}")
     sys.stdout.flush()
@@ -287,38 +466,19 @@ def main():
     
     while True:
         control = load_control()
-        servers = load_servers()
+        servers, cum_weights = load_servers()
         
         # Clean up finished calls
-        finished = []
-        for call in active_calls:
-            if call['proc'].poll() is not None:
-                # Capture QoS metrics from stdout
-                stdout, _ = call['proc'].communicate()
-                qos_data = {}
-                if stdout:
-                    for line in stdout.decode().split('\n'):
-                        if line.startswith("RESULT:"):
-                            try:
-                                qos_data = json.loads(line.replace("RESULT:", "").strip())
-                            except: pass
-                
-                # Merge QoS data into info for logging
-                final_info = {**call['info'], **qos_data}
-                log_call("end", final_info)
-                finished.append(call)
-        
-        for call in finished:
-            timestamp = time.strftime('%H:%M:%S')
-            print(f"[{timestamp}] [{call['info']['call_id']}] ✅ CALL ENDED: {call['info']['target']}")
-            sys.stdout.flush()
-            active_calls.remove(call)
+        finished = [call for call in active_calls if call['future'].done()]
+        if finished:
+            reap_calls(finished)
             
         if control.get("enabled"):
-            if len(active_calls) < control.get("max_simultaneous_calls", 3):
-                server = pick_server(servers)
-                if server:
-                    new_call = start_call(server, control.get("interface", "eth0"))
+            max_calls = int(control.get("max_simultaneous_calls", 3))
+            if len(active_calls) < max_calls:
+                server = pick_server(servers, cum_weights)
+                if server and max_calls > 0:
+                    new_call = start_call(server, control.get("interface", "eth0"), max_calls)
                     if new_call:
                         active_calls.append(new_call)
             else:
@@ -333,7 +493,9 @@ def main():
         
         # Determine check interval
         sleep_time = control.get("sleep_between_calls", 5) if control.get("enabled") else 5
-        time.sleep(sleep_time)
+        flush_stats()
+        save_counter()
+        wait_for_calls(sleep_time)
 
 if __name__ == "__main__":
     main()
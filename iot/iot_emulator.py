@@ -5,27 +5,47 @@ Generates ARP, DHCP, MQTT, HTTP, RTSP, LLDP traffic and cloud heartbeats
 WITH OPTIONAL BAD BEHAVIOR FOR ALERT TESTING (MULTI-BEHAVIOR + PAN TEST DOMAINS)
 """
 
+import heapq
+import itertools
 import json
 import sys
 import time
 import threading
 import logging
+import logging.handlers
 import argparse
+import array
+import atexit
+import ctypes
+import functools
 import random
+import socket
+import struct
 import warnings
 from datetime import datetime
 from pathlib import Path
 import os
+import queue
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Suppress Scapy import errors by redirecting stderr temporarily
 _original_stderr = sys.stderr
 sys.stderr = open(os.devnull, 'w')
 
 try:
-    from scapy.all import (
-        Ether, IP, UDP, TCP, DHCP, ARP, DNS, DNSQR, Raw, BOOTP,
-        sendp, send, conf, sniff, get_if_hwaddr
-    )
+    # Import only the layers we build or parse; scapy.all would load and bind every protocol
+    from scapy.config import conf
+    from scapy.error import Scapy_Exception
+    from scapy.packet import Raw
+    from scapy.layers.l2 import Ether, ARP
+    from scapy.layers.inet import IP, UDP, TCP
+    from scapy.layers.dhcp import BOOTP
+    from scapy.layers.dns import DNS, DNSQR
+    from scapy.sendrecv import sniff
     from scapy.contrib.lldp import (
         LLDPDUChassisID, LLDPDUPortID, LLDPDUTimeToLive,
         LLDPDUSystemName, LLDPDUSystemDescription, LLDPDUEndOfLLDPDU,
@@ -40,31 +60,303 @@ finally:
 logging.getLogger("scapy.runtime").setLevel(logging.ERROR)
 warnings.filterwarnings("ignore")
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('iot_emulator.log'),
-        logging.StreamHandler()
-    ]
-)
+# Configure logging: callers only enqueue records, one listener thread formats and writes them
+_log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+_log_handlers = [logging.FileHandler('iot_emulator.log'), logging.StreamHandler()]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+_log_queue = queue.SimpleQueue()
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
+_log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
+_LOG_LEVELS = {"debug": logging.DEBUG, "info": logging.INFO, "warning": logging.WARNING,
+               "error": logging.ERROR, "critical": logging.CRITICAL}
 
 # Global flag for JSON output and DEBUG mode
 JSON_OUTPUT = False
 DEBUG_MODE = os.getenv('DEBUG', 'false').lower() == 'true'
 ENABLE_BAD_BEHAVIOR = False  # Global flag set by CLI
 
+def _port_pool(low, high, size=4096):
+    """Endless iterator over ports pre-drawn uniformly from [low, high]"""
+    return itertools.cycle(random.choices(range(low, high + 1), k=size))
+
+
+# Shared source-port pools for the bad-behavior loops (next() on a cycle is atomic under the GIL)
+_EPHEMERAL_PORTS = _port_pool(1024, 65535)
+_DNS_SOURCE_PORTS = _port_pool(50000, 60000)
+
+# Body of each simulated exfiltration upload segment
+_EXFIL_PAYLOAD = b"X" * 1400
+
+# Every protocol tag a send can be accounted under (stats counters are preallocated per tag)
+_STATS_PROTOCOLS = ("lldp", "arp", "http", "mqtt", "rtsp", "mdns", "cloud", "dns", "ntp",
+                    "bad_dns", "bad_scan", "bad_beacon", "bad_exfil", "bad_pan_dns", "bad_pan_url")
+
+# Patch layout for prebuilt IPv4 packets (no options): src/dst at 12, L4 source port at 20,
+# UDP checksum at 26, TCP checksum at 36
+_IP_ADDRS = struct.Struct("!4s4s")
+_U16 = struct.Struct("!H")
+
+
+def _bpf_program(instructions):
+    """Pack classic BPF (code, jt, jf, k) instructions into a struct sock_fprog.
+
+    Returns (fprog_bytes, buffer); the buffer holds the instructions the fprog
+    points to and must be kept alive as long as the fprog is used.
+    """
+    insns = b"".join(struct.pack("HBBI", *insn) for insn in instructions)
+    buf = ctypes.create_string_buffer(insns, len(insns))
+    return struct.pack("HP", len(instructions), ctypes.addressof(buf)), buf
+
+
+def _dhcp_reply_filter():
+    """Kernel-side filter for DHCP server replies, as (fprog, buffer).
+
+    Equivalent to tcpdump -dd "ip and udp and not fragment and src port 67
+    and dst port 68"; DhcpReplyDispatcher routes what passes by xid.
+    """
+    return _bpf_program([
+        (0x28, 0, 0, 12),          # ldh [12]                  ethertype
+        (0x15, 0, 10, 0x0800),     # jeq #IPv4              else drop
+        (0x30, 0, 0, 23),          # ldb [23]                  IP protocol
+        (0x15, 0, 8, 17),          # jeq #UDP               else drop
+        (0x28, 0, 0, 20),          # ldh [20]                  flags/fragment offset
+        (0x45, 6, 0, 0x1FFF),      # jset #0x1fff           fragment -> drop
+        (0xB1, 0, 0, 14),          # ldxb 4*([14]&0xf)         IP header length
+        (0x48, 0, 0, 14),          # ldh [x+14]                UDP source port
+        (0x15, 0, 3, 67),          # jeq #67                else drop
+        (0x48, 0, 0, 16),          # ldh [x+16]                UDP destination port
+        (0x15, 0, 1, 68),          # jeq #68                else drop
+        (0x06, 0, 0, 0x40000),     # ret #262144               accept
+        (0x06, 0, 0, 0),           # ret #0                    drop
+    ])
+
+
+# Same filter in pcap syntax, narrowed to one exchange's xid, for the sniff() fallback
+_DHCP_REPLY_PCAP_FILTER = "udp and src port 67 and dst port 68 and udp[12:4] = {xid}"
+_SO_ATTACH_FILTER = 26
+_ETH_P_ALL = 0x0003
+
+
+@functools.lru_cache(maxsize=256)
+def _pack_ip(ip):
+    """inet_aton() for the small, repeating set of device/server addresses"""
+    return socket.inet_aton(ip)
+
+
+def _tcp_checksum_patch(csum, src, sport):
+    """Update a TCP checksum computed with src 0.0.0.0 and sport 0 for the real src/sport (RFC 1624)"""
+    total = (~csum & 0xFFFF) + (src >> 16) + (src & 0xFFFF) + sport
+    while total > 0xFFFF:
+        total = (total & 0xFFFF) + (total >> 16)
+    return ~total & 0xFFFF
+
+
+_DHCP_MAGIC_COOKIE = b"\x63\x82\x53\x63"
+_BOOTP_XID = struct.Struct("!I")
+_DHCP_MSG_TYPES = {"discover": 1, "request": 3}
+_DHCP_OPT_HEADER = struct.Struct("!BB")
+_DHCP_END = b"\xff"
+
+
+def _dhcp_option(code, value):
+    """Encode one DHCP option as code/length/value bytes"""
+    return _DHCP_OPT_HEADER.pack(code, len(value)) + value
+
+
+def _parse_dhcp_reply(frame, xid):
+    """Read what the DHCP exchange needs from a raw Ethernet/IPv4/UDP/BOOTP frame.
+
+    Returns {"src", "yiaddr", "siaddr", "msg_type", "options"} with options
+    mapping option code to its raw value bytes, or None unless the frame is
+    a DHCP message for xid. Walks the option TLVs directly instead of dissecting with scapy.
+    """
+    if len(frame) < 34 or frame[12:14] != b"\x08\x00":
+        return None
+    bootp = 14 + (frame[14] & 0x0F) * 4 + 8
+    options_start = bootp + 240
+    if len(frame) < options_start or frame[bootp + 236:options_start] != _DHCP_MAGIC_COOKIE:
+        return None
+    if _BOOTP_XID.unpack_from(frame, bootp + 4)[0] != xid:
+        return None
+
+    options = {}
+    i, end = options_start, len(frame)
+    while i < end:
+        code = frame[i]
+        if code == 255:  # end
+            break
+        if code == 0:  # pad
+            i += 1
+            continue
+        if i + 1 >= end:
+            break
+        length = frame[i + 1]
+        options[code] = frame[i + 2:i + 2 + length]
+        i += 2 + length
+
+    msg_type = options.get(53)
+    return {
+        "src": socket.inet_ntoa(frame[26:30]),
+        "yiaddr": socket.inet_ntoa(frame[bootp + 16:bootp + 20]),
+        "siaddr": socket.inet_ntoa(frame[bootp + 20:bootp + 24]),
+        "msg_type": msg_type[0] if msg_type else None,
+        "options": options,
+    }
+
+
+# One compact encoder for every IPC line (the dashboard parses each line with JSON.parse)
+_encode_json = json.JSONEncoder(separators=(',', ':')).encode
+
+
 def emit_json(msg_type, **kwargs):
     """Utility to print JSON to stdout for Node.js IPC"""
-    if JSON_OUTPUT:
-        msg = {
-            "type": msg_type,
-            "timestamp": datetime.now().isoformat(),
-            **kwargs
-        }
-        print(json.dumps(msg), flush=True)
+    if not JSON_OUTPUT:
+        return
+    msg = {"type": msg_type, "timestamp": datetime.now().isoformat(), **kwargs}
+    print(_encode_json(msg), flush=True)
+
+
+class LoopScheduler:
+    """Drives periodic device loops for the whole process from one thread.
+
+    A loop is a generator that does one step per next() and yields the
+    seconds until its next step. Loops of a device are dropped once it
+    stops (or is restarted), the next time they come due.
+    """
+
+    def __init__(self):
+        self._queue = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def add(self, device, loop, delay=0, error_prefix="❌ Scheduled loop error"):
+        """Schedule loop for device, first step after delay seconds"""
+        entry = (device, device._run_id, loop, error_prefix)
+        with self._cond:
+            heapq.heappush(self._queue, (time.monotonic() + delay, next(self._seq), entry))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="loop-scheduler", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _next_due(self):
+        """Block until the earliest entry is due, then pop and return it"""
+        with self._cond:
+            while True:
+                if not self._queue:
+                    self._cond.wait()
+                    continue
+                due, seq, entry = self._queue[0]
+                delay = due - time.monotonic()
+                if delay <= 0:
+                    heapq.heappop(self._queue)
+                    return due, seq, entry
+                self._cond.wait(delay)
+
+    def _run(self):
+        while True:
+            due, seq, entry = self._next_due()
+            device, run_id, loop, error_prefix = entry
+            if not device.running or device._run_id != run_id:
+                continue
+
+            try:
+                pause = next(loop)
+            except StopIteration:
+                continue
+            except Exception as e:
+                device.log("error", f"{error_prefix}: {e}")
+                continue
+            # Next step is due pause after this one was *due*, so step time and
+            # wake-up latency do not accumulate; if we fell behind, resync to now
+            now = time.monotonic()
+            due += pause
+            if due < now:
+                due = now + pause
+            with self._cond:
+                heapq.heappush(self._queue, (due, seq, entry))
+
+
+_SCHEDULER = LoopScheduler()
+
+
+class DhcpReplyDispatcher:
+    """Receives DHCP server replies for every device on one socket per interface.
+
+    A reader thread per interface hands each reply to the queue registered
+    for its xid, so concurrent exchanges share a single AF_PACKET socket and
+    kernel filter instead of opening a listener each.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sockets = {}
+        self._waiters = {}
+
+    def register(self, interface, xid):
+        """Return a queue receiving raw reply frames for xid on interface, or None if unsupported"""
+        with self._lock:
+            if interface not in self._sockets:
+                sock = self._open(interface)
+                self._sockets[interface] = sock
+                if sock is not None:
+                    threading.Thread(target=self._run, args=(sock,), name=f"dhcp-{interface}",
+                                     daemon=True).start()
+            if self._sockets[interface] is None:
+                return None
+            waiter = queue.SimpleQueue()
+            self._waiters[xid] = waiter
+            return waiter
+
+    def unregister(self, xid):
+        """Stop routing replies for xid"""
+        with self._lock:
+            self._waiters.pop(xid, None)
+
+    @staticmethod
+    def _open(interface):
+        if not hasattr(socket, "AF_PACKET"):
+            return None
+        try:
+            sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(_ETH_P_ALL))
+        except OSError as e:
+            logger.debug(f"DHCP listener unavailable, falling back to sniff: {e}")
+            return None
+        try:
+            # Attach the filter before binding so nothing else is ever queued
+            fprog, _insns = _dhcp_reply_filter()
+            sock.setsockopt(socket.SOL_SOCKET, _SO_ATTACH_FILTER, fprog)
+            sock.bind((interface, _ETH_P_ALL))
+        except OSError as e:
+            sock.close()
+            logger.debug(f"DHCP listener unavailable, falling back to sniff: {e}")
+            return None
+        return sock
+
+    def _run(self, sock):
+        while True:
+            try:
+                frame = sock.recv(4096)
+            except OSError as e:
+                logger.error(f"❌ DHCP listener error: {e}")
+                return
+            # The filter guarantees IPv4/UDP; xid sits 12 bytes into the UDP payload
+            offset = 14 + (frame[14] & 0x0F) * 4 + 12
+            if len(frame) < offset + 4:
+                continue
+            waiter = self._waiters.get(_BOOTP_XID.unpack_from(frame, offset)[0])
+            if waiter is not None:
+                waiter.put(frame)
+
+
+_DHCP_REPLIES = DhcpReplyDispatcher()
 
 
 class IoTDevice:
@@ -121,7 +413,7 @@ class IoTDevice:
     }
     
     # Suspicious domains for bad behavior testing
-    SUSPICIOUS_DOMAINS = [
+    SUSPICIOUS_DOMAINS = (
         "update.windows.com",
         "api.github.com",
         "docker.io",
@@ -135,10 +427,10 @@ class IoTDevice:
         "malware-download.xyz",
         "phishing-site.bad",
         "cryptominer.evil"
-    ]
+    )
     
     # Palo Alto Networks official test domains for guaranteed detection
-    PAN_DNS_TEST_DOMAINS = [
+    PAN_DNS_TEST_DOMAINS = (
         "test-malware.testpanw.com",
         "test-phishing.testpanw.com",
         "test-dnstun.testpanw.com",
@@ -163,9 +455,9 @@ class IoTDevice:
         "test-squatting.testpanw.com",
         "test-subdomain-reputation.testpanw.com",
         "test-fake-software.testpanw.com"
-    ]
+    )
     
-    PAN_URL_TEST_TARGETS = [
+    PAN_URL_TEST_TARGETS = (
         ("urlfiltering.paloaltonetworks.com", "/test-malware"),
         ("urlfiltering.paloaltonetworks.com", "/test-phishing"),
         ("urlfiltering.paloaltonetworks.com", "/test-command-and-control"),
@@ -174,7 +466,7 @@ class IoTDevice:
         ("urlfiltering.paloaltonetworks.com", "/test-adult"),
         ("urlfiltering.paloaltonetworks.com", "/test-gambling"),
         ("urlfiltering.paloaltonetworks.com", "/test-abused-drugs")
-    ]
+    )
     
     def __init__(self, device_config, interface="eth0", dhcp_mode="auto"):
         self.id = device_config.get("id")
@@ -197,10 +489,41 @@ class IoTDevice:
         self.dhcp_mode = dhcp_mode
         self.start_time = None
 
+        # Long-lived scapy sockets, opened on first send and closed in stop()
+        self._l2_sock = None
+        self._l3_sock = None
+        self._raw_sock = None
+        self._sock_lock = threading.Lock()
+        # Bumped by start() so the scheduler drops loops left over from a previous run
+        self._run_id = 0
+        # Set by stop() to wake the DHCP renewal thread; replaced on each start()
+        self._renewal_stop = threading.Event()
+
         # Optional fingerprint config (from JSON, generated by LLM or manual)
         self.fingerprint = device_config.get("fingerprint", {})
         self.dhcp_fingerprint = self.fingerprint.get("dhcp", {})
         self.http_fingerprint = self.fingerprint.get("http", {})
+
+        # Per-device DHCP constants, encoded once instead of on every exchange
+        try:
+            self._mac_bytes = bytes.fromhex(self.mac.replace(":", ""))
+        except Exception:
+            self._mac_bytes = None
+        fp = self.dhcp_fingerprint or {}
+        self._dhcp_hostname = fp.get("hostname", self.name or self.id or "iot-device")
+        default_vendor_class = f"{self.vendor} {self.device_type}".strip() if (self.vendor or self.device_type) else "Generic IoT Device"
+        self._dhcp_vendor_class_id = fp.get("vendor_class_id", default_vendor_class)
+        self._hostname_bytes = self._dhcp_hostname.encode()
+        self._vendor_class_bytes = self._dhcp_vendor_class_id.encode()
+        if self._mac_bytes is not None:
+            self._client_id = bytes([fp.get("client_id_type", 1)]) + self._mac_bytes
+        else:
+            self._client_id = b"\x01\x00\x00\x00\x00\x00\x00"
+        self._dhcp_opts = {}
+        # Broadcast Ether/IP/UDP layers shared by every DISCOVER and REQUEST
+        self._dhcp_skel = Ether(dst="ff:ff:ff:ff:ff:ff", src=self.mac) / \
+                          IP(src="0.0.0.0", dst="255.255.255.255") / \
+                          UDP(sport=68, dport=67)
         
         # Security / Bad Behavior config - SUPPORT MULTI-BEHAVIORS
         self.security_config = device_config.get("security", {})
@@ -214,66 +537,170 @@ class IoTDevice:
             self.behavior_types = [behavior_cfg]  # Single behavior -> list with 1 element
         
         # Stats tracking
-        self.stats = {
-            "packets_sent": 0,
-            "bytes_sent": 0,
-            "protocols": {p: 0 for p in self.protocols},
-            "bad_behavior_active": False
-        }
+        # Counters live in a fixed-size array indexed by protocol so sends never
+        # resize a dict that emit_stats may be iterating from another thread
+        self.stats = {"bad_behavior_active": False}
+        self._packets_sent = 0
+        self._bytes_sent = 0
+        self._proto_idx = {p: i for i, p in enumerate(dict.fromkeys([*self.protocols, *_STATS_PROTOCOLS]))}
+        self._proto_counters = array.array("Q", bytes(8 * len(self._proto_idx)))
     
-    def log(self, level, message, **kwargs):
-        """Unified logging that supports JSON output"""
+    def log(self, level, message, *args, **kwargs):
+        """Unified logging that supports JSON output.
+
+        With args, message is a %-format string that is only rendered if the
+        record is actually emitted (e.g. debug lines cost nothing when DEBUG is off).
+        """
         if JSON_OUTPUT:
+            if args:
+                message = message % args
             emit_json("log", device_id=self.id, level=level, message=message, **kwargs)
         else:
-            log_func = getattr(logger, level.lower(), logger.info)
-            log_func(f"{self.id}: {message}")
+            levelno = _LOG_LEVELS.get(level.lower(), logging.INFO)
+            if not logger.isEnabledFor(levelno):
+                return
+            if args:
+                logger.log(levelno, "%s: " + message, self.id, *args)
+            else:
+                logger.log(levelno, f"{self.id}: {message}")
 
     def emit_stats(self):
         """Emit current stats in JSON format"""
         if JSON_OUTPUT:
             uptime = int(time.time() - self.start_time) if self.start_time else 0
+            counters = self._proto_counters.tolist()
+            protocols = {p: counters[i] for p, i in self._proto_idx.items()
+                         if counters[i] or p in self.protocols}
             emit_json("stats", device_id=self.id, stats={
-                "packets_sent": self.stats["packets_sent"],
-                "bytes_sent": self.stats["bytes_sent"],
+                "packets_sent": self._packets_sent,
+                "bytes_sent": self._bytes_sent,
                 "current_ip": self.ip,
                 "uptime_seconds": uptime,
-                "protocols": self.stats["protocols"],
+                "protocols": protocols,
                 "bad_behavior_active": self.stats["bad_behavior_active"]
             })
 
+    def _count_sent(self, nbytes, protocol):
+        """Account one sent packet of nbytes under protocol"""
+        self._packets_sent += 1
+        self._bytes_sent += nbytes
+        idx = self._proto_idx.get(protocol)
+        if idx is not None:
+            self._proto_counters[idx] += 1
+
+    def _get_l3_socket(self):
+        """Return the device's L3 socket, opening it on first use"""
+        with self._sock_lock:
+            if self._l3_sock is None:
+                self._l3_sock = conf.L3socket()
+            return self._l3_sock
+
+    def _get_l2_socket(self):
+        """Return the device's L2 socket on self.interface, opening it on first use"""
+        with self._sock_lock:
+            if self._l2_sock is None:
+                self._l2_sock = conf.L2socket(iface=self.interface)
+            return self._l2_sock
+
+    def _get_raw_socket(self):
+        """Return the device's IPPROTO_RAW socket (we supply the IP header), opening it on first use"""
+        with self._sock_lock:
+            if self._raw_sock is None:
+                self._raw_sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_RAW)
+            return self._raw_sock
+
+    def _close_sockets(self):
+        """Close the long-lived sockets"""
+        with self._sock_lock:
+            for sock in (self._l2_sock, self._l3_sock, self._raw_sock):
+                if sock is not None:
+                    try:
+                        sock.close()
+                    except Exception:
+                        pass
+            self._l2_sock = None
+            self._l3_sock = None
+            self._raw_sock = None
+
     def _send(self, pkt, protocol=None, **kwargs):
-        """Wrapper for scapy.send with stats tracking"""
+        """Send at L3 on the device's persistent socket, with stats tracking.
+
+        scapy.send() opens and closes a raw socket on every call; reusing one
+        per device removes that from every packet.
+        """
         try:
-            send(pkt, **kwargs)
-            self.stats["packets_sent"] += 1
-            self.stats["bytes_sent"] += len(pkt)
-            if protocol:
-                self.stats["protocols"][protocol] = self.stats["protocols"].get(protocol, 0) + 1
+            self._get_l3_socket().send(pkt)
+            self._count_sent(len(pkt), protocol)
+        except Exception as e:
+            self.log("error", f"Send error: {e}")
+
+    def _source_ip(self, dst):
+        """Source address for raw sends: the device IP, or before one is known
+        (no --ip-static, DHCP pending or failed) the address scapy routes dst
+        from, as IP(src=None) did."""
+        return self.ip or conf.route.route(dst)[1]
+
+    def _send_udp_raw(self, template, dst, sport, protocol=None):
+        """Send a prebuilt IPv4/UDP datagram after patching addresses and source port.
+
+        The kernel fills in the IP checksum for IPPROTO_RAW sockets; the UDP
+        checksum is sent as zero (checksum disabled, valid for IPv4).
+        """
+        try:
+            buf = bytearray(template)
+            buf[10:12] = b"\x00\x00"
+            _IP_ADDRS.pack_into(buf, 12, _pack_ip(self._source_ip(dst)), _pack_ip(dst))
+            _U16.pack_into(buf, 20, sport)
+            buf[26:28] = b"\x00\x00"
+            self._get_raw_socket().sendto(buf, (dst, 0))
+            self._count_sent(len(buf), protocol)
+        except Exception as e:
+            self.log("error", f"Send error: {e}")
+
+    def _send_tcp_raw(self, template, sport, protocol=None):
+        """Send a prebuilt IPv4/TCP segment (src 0.0.0.0, sport 0) from the device IP:sport.
+
+        Only the source address and port change, so the TCP checksum is
+        patched incrementally instead of being recomputed over the payload.
+        """
+        try:
+            dst = socket.inet_ntoa(template[16:20])
+            src = _pack_ip(self._source_ip(dst))
+            buf = bytearray(template)
+            buf[10:12] = b"\x00\x00"
+            buf[12:16] = src
+            _U16.pack_into(buf, 20, sport)
+            csum = _U16.unpack_from(template, 36)[0]
+            _U16.pack_into(buf, 36, _tcp_checksum_patch(csum, int.from_bytes(src, "big"), sport))
+            self._get_raw_socket().sendto(buf, (dst, 0))
+            self._count_sent(len(buf), protocol)
         except Exception as e:
             self.log("error", f"Send error: {e}")
 
     def _sendp(self, pkt, protocol=None, **kwargs):
-        """Wrapper for scapy.sendp with stats tracking"""
+        """Send at L2 on the device's persistent socket, with stats tracking"""
         try:
-            sendp(pkt, **kwargs)
-            self.stats["packets_sent"] += 1
-            self.stats["bytes_sent"] += len(pkt)
-            if protocol:
-                self.stats["protocols"][protocol] = self.stats["protocols"].get(protocol, 0) + 1
+            self._get_l2_socket().send(pkt)
+            self._count_sent(len(pkt), protocol)
         except Exception as e:
             self.log("error", f"Sendp error: {e}")
         
     def __repr__(self):
         return f"[{self.vendor}] {self.name} ({self.ip})"
     
-    def start(self):
-        """Start device emulation threads"""
+    def start(self, stagger=0):
+        """Start device emulation without blocking.
+
+        Protocol loops first run stagger seconds from now, plus 2s for the
+        initial DHCP exchange when the device uses DHCP.
+        """
         if not self.enabled:
             self.log("warning", "Device is disabled, skipping")
             return
         
         self.running = True
+        self._run_id += 1
+        self._renewal_stop = threading.Event()
         self.start_time = time.time()
         
         # Standard Interface Diagnostic
@@ -297,42 +724,29 @@ class IoTDevice:
         if JSON_OUTPUT:
             emit_json("started", device_id=self.id)
         
-        # Start stats reporter thread if in JSON mode
-        if JSON_OUTPUT:
-            threading.Thread(target=self._stats_reporter_loop, daemon=True).start()
-
-        # Start with DHCP to get IP (if dhcp in protocols)
+        # Start with DHCP to get IP (if dhcp in protocols); traffic waits for it
         if "dhcp" in self.protocols:
             threading.Thread(target=self.do_dhcp_sequence, daemon=True).start()
-            time.sleep(2)
+            stagger += 2
         
-        # Start protocol-specific threads
-        for protocol in self.protocols:
-            if protocol == "snmp":
-                self.log("warning", "⚠️ SNMP protocol is deprecated and will be ignored (incompatible with host mode)")
-                continue
-                
-            if protocol != "dhcp":
-                thread = threading.Thread(
-                    target=self._protocol_handler,
-                    args=(protocol,),
-                    daemon=True
-                )
-                thread.start()
+        # Protocol loops (and the JSON stats reporter) run on the process-wide scheduler
+        self._schedule_protocol_loops(stagger)
         
         # DHCP renewal thread (periodic)
         if "dhcp" in self.protocols:
-            thread = threading.Thread(target=self.dhcp_renewal_loop, daemon=True)
+            thread = threading.Thread(target=self.dhcp_renewal_loop, args=(self._renewal_stop,), daemon=True)
             thread.start()
         
-        # Start BAD BEHAVIOR threads if enabled (one thread per behavior type)
+        # Start the BAD BEHAVIOR loops if enabled (scheduled once the device has an IP)
         if ENABLE_BAD_BEHAVIOR and self.bad_behavior:
-            thread = threading.Thread(target=self._bad_behavior_handler, daemon=True)
-            thread.start()
+            _SCHEDULER.add(self, self._bad_behavior_handler(), delay=stagger,
+                           error_prefix="❌ Bad behavior error")
     
     def stop(self):
         """Stop device emulation"""
         self.running = False
+        self._renewal_stop.set()
+        self._close_sockets()
         self.log("info", "⏹️ Simulation stopped")
         if JSON_OUTPUT:
             self.emit_stats() # Final stats
@@ -341,42 +755,49 @@ class IoTDevice:
     def _stats_reporter_loop(self):
         """Periodically report stats in JSON mode"""
         while self.running:
-            time.sleep(5)
+            yield 5
             if self.running:
                 self.emit_stats()
     
-    def _protocol_handler(self, protocol):
-        """Route to protocol handler"""
+    def _schedule_protocol_loops(self, delay=0):
+        """Hand every configured protocol loop to the process-wide scheduler, first step after delay seconds"""
         handlers = {
             "arp": self.send_arp,
             "lldp": self.send_lldp,
-            "http": self.send_http,
-            "mqtt": self.send_mqtt,
-            "rtsp": self.send_rtsp,
             "mdns": self.send_mdns,
             "cloud": self.send_cloud_traffic,
             "dns": self.send_dns,
             "ntp": self.send_ntp,
         }
         
-        handler = handlers.get(protocol)
-        if handler:
-            handler()
-        else:
-            logger.warning(f"{self.id}: Unknown protocol: {protocol}")
+        if JSON_OUTPUT:
+            _SCHEDULER.add(self, self._stats_reporter_loop(), delay=delay)
+        for protocol in self.protocols:
+            if protocol == "snmp":
+                self.log("warning", "⚠️ SNMP protocol is deprecated and will be ignored (incompatible with host mode)")
+                continue
+            if protocol == "dhcp":
+                continue
+            handler = handlers.get(protocol)
+            if handler:
+                _SCHEDULER.add(self, handler(), delay=delay)
+            elif protocol in self.SYN_PROTOCOLS:
+                _SCHEDULER.add(self, self.send_tcp_syn(protocol), delay=delay)
+            else:
+                logger.warning(f"{self.id}: Unknown protocol: {protocol}")
     
     # ========================================================================
     # BAD BEHAVIOR HANDLERS - MULTI-BEHAVIOR SUPPORT + PAN TEST DOMAINS
     # ========================================================================
     
     def _bad_behavior_handler(self):
-        """Main bad behavior dispatcher - lance tous les behavior_types en parallèle"""
+        """Main bad behavior dispatcher - schedules every behavior_type once the device has an IP"""
         self.log("warning", f"💀 BAD BEHAVIOR thread started (types: {', '.join(self.behavior_types)})")
         
         # Wait for IP assignment
         wait_count = 0
         while (not self.ip or self.ip == "0.0.0.0") and wait_count < 30:
-            time.sleep(0.5)
+            yield 0.5
             wait_count += 1
         
         if not self.ip or self.ip == "0.0.0.0":
@@ -393,45 +814,67 @@ class IoTDevice:
             "pan_test_domains": self._bad_pan_test_domains  # NEW: PAN official test domains
         }
         
-        # Start a thread for each behavior type
+        # Each behavior is a generator yielding the seconds until its next step
+        started = 0
         for behavior_type in self.behavior_types:
             handler = behavior_handlers.get(behavior_type)
             if handler:
-                self.log("warning", f"💀 Starting behavior thread: {behavior_type}")
-                thread = threading.Thread(
-                    target=handler, 
-                    daemon=True, 
-                    name=f"bad_{behavior_type}_{self.id}"
-                )
-                thread.start()
-                time.sleep(0.2)  # Small delay between thread starts
+                self.log("warning", f"💀 Starting behavior: {behavior_type}")
+                # Keep the small stagger between behavior starts
+                _SCHEDULER.add(self, handler(), delay=0.2 * started, error_prefix="❌ Bad behavior error")
+                started += 1
             else:
                 self.log("error", f"❌ Unknown behavior type: {behavior_type}")
-    
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _dns_query_bytes(domain, sport=0):
+        """Wire-format IPv4/UDP/DNS A query for domain, addressed later by _send_udp_raw
+
+        Cached across devices: the domain sets are fixed, so each is encoded once per process.
+        """
+        return bytes(IP(src="0.0.0.0", dst="0.0.0.0") /
+                     UDP(sport=sport, dport=53) /
+                     DNS(rd=1, qd=DNSQR(qname=domain, qtype="A")))
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _tcp_segment_bytes(dst, dport, flags="S"):
+        """Wire-format IPv4/TCP segment to dst:dport, addressed and sent later by _send_tcp_raw"""
+        return bytes(IP(src="0.0.0.0", dst=dst) / TCP(sport=0, dport=dport, flags=flags))
+
+    @staticmethod
+    @functools.lru_cache(maxsize=8)
+    def _udp_datagram_bytes(dport):
+        """Wire-format empty IPv4/UDP datagram to dport, addressed later by _send_udp_raw"""
+        return bytes(IP(src="0.0.0.0", dst="0.0.0.0") / UDP(sport=0, dport=dport))
+
     def _bad_dns_flood(self):
         """Flood DNS with suspicious/random domains"""
         self.log("warning", "💀 DNS FLOOD behavior started")
         dns_servers = self.PUBLIC_SERVICES["dns"] + [self.gateway]
+
+        # Serialize each query once; per send only addresses and source port are patched
+        queries = {domain: self._dns_query_bytes(domain) for domain in self.SUSPICIOUS_DOMAINS}
         
         while self.running:
             try:
-                for _ in range(10):  # Burst of 10 queries
-                    domain = random.choice(self.SUSPICIOUS_DOMAINS)
-                    dns_server = random.choice(dns_servers)
+                sent = []
+                # Burst of 10 queries, drawn in one batch
+                for domain, dns_server in zip(random.choices(self.SUSPICIOUS_DOMAINS, k=10),
+                                              random.choices(dns_servers, k=10)):
+                    self._send_udp_raw(queries[domain], dns_server, next(_DNS_SOURCE_PORTS), protocol="bad_dns")
+                    sent.append(f"{domain} → {dns_server}")
                     
-                    pkt = IP(src=self.ip, dst=dns_server) / \
-                          UDP(sport=random.randint(50000, 60000), dport=53) / \
-                          DNS(rd=1, qd=DNSQR(qname=domain, qtype="A"))
-                    
-                    self._send(pkt, protocol="bad_dns", verbose=0)
-                    self.log("warning", f"💀 [dns_flood] Query: {domain} → {dns_server}")
-                    
-                    time.sleep(0.5)
+                    yield 0.5
+                
+                # One log line per burst rather than per packet
+                self.log("warning", f"💀 [dns_flood] Burst of {len(sent)} queries: {', '.join(sent)}")
                 
             except Exception as e:
                 self.log("error", f"❌ Bad DNS flood error: {e}")
             
-            time.sleep(15)  # Repeat every 15s
+            yield 15  # Repeat every 15s
     
     def _bad_port_scan(self):
         """Simulate port scanning behavior"""
@@ -439,29 +882,28 @@ class IoTDevice:
         
         # Scan gateway + random internal IPs
         targets = [self.gateway]
-        base_ip = ".".join(self.gateway.split(".")[0:3])
+        base_ip = self.gateway.rsplit(".", 1)[0]
         for _ in range(5):
             targets.append(f"{base_ip}.{random.randint(1, 254)}")
         
         common_ports = [21, 22, 23, 80, 443, 445, 3389, 8080, 8443, 10000]
+        port_list = ",".join(map(str, common_ports))
         
         while self.running:
             try:
                 target = random.choice(targets)
                 
                 for port in common_ports:
-                    pkt = IP(src=self.ip, dst=target) / \
-                          TCP(sport=random.randint(1024, 65535), dport=port, flags="S")
-                    
-                    self._send(pkt, protocol="bad_scan", verbose=0)
-                    self.log("warning", f"💀 [port_scan] Scan: {target}:{port}")
+                    self._send_tcp_raw(self._tcp_segment_bytes(target, port), next(_EPHEMERAL_PORTS), protocol="bad_scan")
                     
-                    time.sleep(0.1)
+                    yield 0.1
+                
+                self.log("warning", f"💀 [port_scan] Scan: {target} ports {port_list}")
                 
             except Exception as e:
                 self.log("error", f"❌ Bad port scan error: {e}")
             
-            time.sleep(30)  # Repeat every 30s
+            yield 30  # Repeat every 30s
     
     def _bad_beacon(self):
         """Simulate C2 beacon behavior (regular DNS/HTTP to same suspicious domain)"""
@@ -470,30 +912,26 @@ class IoTDevice:
         beacon_domain = "c2.malware-test.org"
         beacon_ip = "198.51.100.66"  # TEST-NET-2 (won't respond but that's OK)
         dns_server = self.PUBLIC_SERVICES["dns"][0]
+
+        beacon_query = self._dns_query_bytes(beacon_domain)
+        beacon_syn = self._tcp_segment_bytes(beacon_ip, 8443)
         
         while self.running:
             try:
                 # DNS beacon
-                pkt_dns = IP(src=self.ip, dst=dns_server) / \
-                          UDP(sport=53000, dport=53) / \
-                          DNS(rd=1, qd=DNSQR(qname=beacon_domain, qtype="A"))
-                
-                self._send(pkt_dns, protocol="bad_beacon", verbose=0)
+                self._send_udp_raw(beacon_query, dns_server, 53000, protocol="bad_beacon")
                 self.log("warning", f"💀 [beacon] DNS: {beacon_domain}")
                 
-                time.sleep(1)
+                yield 1
                 
                 # HTTP beacon (SYN to fake C2)
-                pkt_http = IP(src=self.ip, dst=beacon_ip) / \
-                           TCP(sport=random.randint(1024, 65535), dport=8443, flags="S")
-                
-                self._send(pkt_http, protocol="bad_beacon", verbose=0)
+                self._send_tcp_raw(beacon_syn, next(_EPHEMERAL_PORTS), protocol="bad_beacon")
                 self.log("warning", f"💀 [beacon] HTTP: {beacon_ip}:8443")
                 
             except Exception as e:
                 self.log("error", f"❌ Bad beacon error: {e}")
             
-            time.sleep(10)  # Every 10s (classic beacon interval)
+            yield 10  # Every 10s (classic beacon interval)
     
     def _bad_data_exfil(self):
         """Simulate data exfiltration (large uploads to external IPs)"""
@@ -504,79 +942,80 @@ class IoTDevice:
             ("203.0.113.50", 8080),  # Fake HTTP proxy
         ]
         
+        # One wire-format segment per target; each send only patches source address/port
+        segments = {
+            target: bytes(IP(src="0.0.0.0", dst=target[0]) /
+                          TCP(sport=0, dport=target[1], flags="PA") /
+                          Raw(_EXFIL_PAYLOAD))
+            for target in exfil_targets
+        }
+        
         while self.running:
             try:
                 target_ip, target_port = random.choice(exfil_targets)
+                segment = segments[(target_ip, target_port)]
                 
                 # Send multiple large TCP packets
                 for _ in range(5):
-                    payload = Raw(b"X" * 1400)  # Large payload
-                    pkt = IP(src=self.ip, dst=target_ip) / \
-                          TCP(sport=random.randint(1024, 65535), dport=target_port, flags="PA") / \
-                          payload
-                    
-                    self._send(pkt, protocol="bad_exfil", verbose=0)
-                    self.log("warning", f"💀 [data_exfil] Upload: {target_ip}:{target_port} ({len(payload)} bytes)")
+                    self._send_tcp_raw(segment, next(_EPHEMERAL_PORTS), protocol="bad_exfil")
                     
-                    time.sleep(0.5)
+                    yield 0.5
+                
+                self.log("warning", f"💀 [data_exfil] Upload: {target_ip}:{target_port} (5 x {len(_EXFIL_PAYLOAD)} bytes)")
                 
             except Exception as e:
                 self.log("error", f"❌ Bad exfil error: {e}")
             
-            time.sleep(20)  # Every 20s
+            yield 20  # Every 20s
     
     def _bad_pan_test_domains(self):
         """Test with official Palo Alto Networks test domains for GUARANTEED detection"""
         self.log("warning", "💀 PAN TEST DOMAINS behavior started (DNS Security + URL Filtering)")
         dns_servers = self.PUBLIC_SERVICES["dns"] + [self.gateway]
+
+        # urlfiltering.paloaltonetworks.com IP (one of their test IPs)
+        pan_url_ip = "35.223.6.162"
+
+        queries = {domain: self._dns_query_bytes(domain) for domain in self.PAN_DNS_TEST_DOMAINS}
+        syn_https = self._tcp_segment_bytes(pan_url_ip, 443)
+        syn_http = self._tcp_segment_bytes(pan_url_ip, 80)
         
         while self.running:
             try:
                 # DNS Security tests - cycle through PAN test domains
-                for _ in range(5):  # Burst of 5 DNS queries
-                    domain = random.choice(self.PAN_DNS_TEST_DOMAINS)
-                    dns_server = random.choice(dns_servers)
-                    
-                    pkt = IP(src=self.ip, dst=dns_server) / \
-                          UDP(sport=random.randint(50000, 60000), dport=53) / \
-                          DNS(rd=1, qd=DNSQR(qname=domain, qtype="A"))
+                sent = []
+                # Burst of 5 DNS queries, drawn in one batch
+                for domain, dns_server in zip(random.choices(self.PAN_DNS_TEST_DOMAINS, k=5),
+                                              random.choices(dns_servers, k=5)):
+                    self._send_udp_raw(queries[domain], dns_server, next(_DNS_SOURCE_PORTS), protocol="bad_pan_dns")
+                    sent.append(f"{domain} → {dns_server}")
                     
-                    self._send(pkt, protocol="bad_pan_dns", verbose=0)
-                    self.log("warning", f"💀 [pan_test] DNS Security: {domain} → {dns_server}")
-                    
-                    time.sleep(1)
+                    yield 1
+                
+                self.log("warning", f"💀 [pan_test] DNS Security: {', '.join(sent)}")
                 
-                time.sleep(5)
+                yield 5
                 
                 # URL Filtering tests (HTTP/HTTPS SYN to trigger detection)
-                for _ in range(3):
-                    host, path = random.choice(self.PAN_URL_TEST_TARGETS)
-                    
-                    # urlfiltering.paloaltonetworks.com IP (one of their test IPs)
-                    pan_url_ip = "35.223.6.162"
-                    
+                sent = []
+                for host, path in random.choices(self.PAN_URL_TEST_TARGETS, k=3):
                     # HTTPS (443) - will trigger SNI-based detection if SSL inspection enabled
-                    pkt_https = IP(src=self.ip, dst=pan_url_ip) / \
-                               TCP(sport=random.randint(1024, 65535), dport=443, flags="S")
-                    
-                    self._send(pkt_https, protocol="bad_pan_url", verbose=0)
-                    self.log("warning", f"💀 [pan_test] URL Filter HTTPS: {host}{path} → {pan_url_ip}:443")
+                    self._send_tcp_raw(syn_https, next(_EPHEMERAL_PORTS), protocol="bad_pan_url")
                     
-                    time.sleep(2)
+                    yield 2
                     
                     # HTTP (80)
-                    pkt_http = IP(src=self.ip, dst=pan_url_ip) / \
-                              TCP(sport=random.randint(1024, 65535), dport=80, flags="S")
-                    
-                    self._send(pkt_http, protocol="bad_pan_url", verbose=0)
-                    self.log("warning", f"💀 [pan_test] URL Filter HTTP: {host}{path} → {pan_url_ip}:80")
+                    self._send_tcp_raw(syn_http, next(_EPHEMERAL_PORTS), protocol="bad_pan_url")
+                    sent.append(f"{host}{path}")
                     
-                    time.sleep(2)
+                    yield 2
+                
+                self.log("warning", f"💀 [pan_test] URL Filter HTTP/HTTPS: {', '.join(sent)} → {pan_url_ip}:80,443")
                 
             except Exception as e:
                 self.log("error", f"❌ PAN test domains error: {e}")
             
-            time.sleep(20)  # Repeat every 20s
+            yield 20  # Repeat every 20s
     
     def _bad_random_mix(self):
         """Random mix of all bad behaviors"""
@@ -596,18 +1035,14 @@ class IoTDevice:
             except Exception as e:
                 self.log("error", f"❌ Bad random behavior error: {e}")
             
-            time.sleep(random.randint(5, 15))
+            yield random.randint(5, 15)
     
     def _bad_dns_suspicious_single(self):
         """Send one suspicious DNS query"""
         domain = random.choice(self.SUSPICIOUS_DOMAINS)
         dns_server = random.choice(self.PUBLIC_SERVICES["dns"])
         
-        pkt = IP(src=self.ip, dst=dns_server) / \
-              UDP(sport=random.randint(50000, 60000), dport=53) / \
-              DNS(rd=1, qd=DNSQR(qname=domain, qtype="A"))
-        
-        self._send(pkt, protocol="bad_dns", verbose=0)
+        self._send_udp_raw(self._dns_query_bytes(domain), dns_server, next(_DNS_SOURCE_PORTS), protocol="bad_dns")
         self.log("warning", f"💀 [random] DNS: {domain}")
     
     def _bad_port_scan_single(self):
@@ -615,10 +1050,7 @@ class IoTDevice:
         target = self.gateway
         port = random.choice([22, 23, 445, 3389, 8080])
         
-        pkt = IP(src=self.ip, dst=target) / \
-              TCP(sport=random.randint(1024, 65535), dport=port, flags="S")
-        
-        self._send(pkt, protocol="bad_scan", verbose=0)
+        self._send_tcp_raw(self._tcp_segment_bytes(target, port), next(_EPHEMERAL_PORTS), protocol="bad_scan")
         self.log("warning", f"💀 [random] Scan: {target}:{port}")
     
     def _bad_beacon_single(self):
@@ -626,99 +1058,124 @@ class IoTDevice:
         beacon_domain = "c2.malware-test.org"
         dns_server = self.PUBLIC_SERVICES["dns"][0]
         
-        pkt = IP(src=self.ip, dst=dns_server) / \
-              UDP(sport=53000, dport=53) / \
-              DNS(rd=1, qd=DNSQR(qname=beacon_domain, qtype="A"))
-        
-        self._send(pkt, protocol="bad_beacon", verbose=0)
+        self._send_udp_raw(self._dns_query_bytes(beacon_domain), dns_server, 53000, protocol="bad_beacon")
         self.log("warning", f"💀 [random] Beacon: {beacon_domain}")
     
     # ========================================================================
     # DHCP / NORMAL PROTOCOL HANDLERS (unchanged)
     # ========================================================================
     
-    def parse_dhcp_options(self, packet):
-        """Parse DHCP options and return as dict"""
-        options = {}
-        if DHCP in packet:
-            for opt in packet[DHCP].options:
-                if isinstance(opt, tuple) and len(opt) == 2:
-                    options[opt[0]] = opt[1]
-        return options
-
     def build_dhcp_options(self, msg_type="discover"):
-        """Build DHCP options with optional fingerprint from JSON."""
+        """Build the encoded DHCP options with optional fingerprint from JSON.
+
+        Returns the magic cookie followed by the option TLVs, without the end
+        option so callers can append per-exchange options. Options are
+        per-device constants apart from the message type, so each blob is
+        built (and the fingerprint logged) once and then reused.
+        """
+        options = self._dhcp_opts.get(msg_type)
+        if options is not None:
+            return options
+
         fp = self.dhcp_fingerprint or {}
-        hostname = fp.get("hostname", self.name or self.id or "iot-device")
-        default_vendor_class = f"{self.vendor} {self.device_type}".strip() if (self.vendor or self.device_type) else "Generic IoT Device"
-        vendor_class_id = fp.get("vendor_class_id", default_vendor_class)
+        hostname = self._dhcp_hostname
+        vendor_class_id = self._dhcp_vendor_class_id
         param_req_list = fp.get("param_req_list", [1, 3, 6, 15, 28, 51, 54])
-        client_id_type = fp.get("client_id_type", 1)
 
-        if fp:
+        if self._dhcp_opts:
+            pass  # Fingerprint already reported with the first message type
+        elif fp:
             self.log("info", f"🔐 Using DHCP fingerprint: hostname='{hostname}', vendor_class='{vendor_class_id}', param_req_list={param_req_list}")
         else:
             self.log("info", f"⚠️ No fingerprint provided, using defaults: hostname='{hostname}', vendor_class='{vendor_class_id}', param_req_list={param_req_list}")
 
-        try:
-            client_id = bytes([client_id_type]) + bytes.fromhex(self.mac.replace(":", ""))
-        except Exception:
-            client_id = b"\x01\x00\x00\x00\x00\x00\x00"
-
-        options = [
-            ("message-type", msg_type),
-            ("hostname", hostname.encode()),
-            ("client_id", client_id),
-            ("vendor_class_id", vendor_class_id.encode()),
-            ("param_req_list", param_req_list),
-            ("end"),
-        ]
+        options = b"".join((
+            _DHCP_MAGIC_COOKIE,
+            _dhcp_option(53, bytes([_DHCP_MSG_TYPES[msg_type]])),
+            _dhcp_option(12, self._hostname_bytes),
+            _dhcp_option(61, self._client_id),
+            _dhcp_option(60, self._vendor_class_bytes),
+            _dhcp_option(55, bytes(param_req_list)),
+        ))
+        self._dhcp_opts[msg_type] = options
         return options
     
+    def _wait_dhcp_reply(self, listener, timeout=3, skip_types=()):
+        """Return the first parsed reply to self.dhcp_xid within timeout (see _parse_dhcp_reply), else None
+
+        Replies whose message type is in skip_types (e.g. a repeated OFFER still
+        queued on the listener while waiting for the ACK) are ignored.
+        """
+        xid = self.dhcp_xid
+        if listener is None:
+            matched = []
+            # Our own DISCOVER/REQUEST (types 1 and 3) carry the same xid when unfiltered
+            ignored = (1, 3, *skip_types)
+
+            def stop(pkt):
+                # Keep only the first usable reply and end the capture there (store=0)
+                reply = _parse_dhcp_reply(bytes(pkt), xid)
+                if reply is None or reply["msg_type"] in ignored:
+                    return False
+                matched.append(reply)
+                return True
+            try:
+                # Let libpcap drop everything but this exchange's replies in the kernel
+                sniff(iface=self.interface, filter=_DHCP_REPLY_PCAP_FILTER.format(xid=xid),
+                      stop_filter=stop, timeout=timeout, store=0)
+            except Scapy_Exception:
+                # No libpcap to compile the filter: match every frame in Python
+                sniff(iface=self.interface, stop_filter=stop, timeout=timeout, store=0)
+            return matched[0] if matched else None
+
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            try:
+                frame = listener.get(timeout=remaining)
+            except queue.Empty:
+                return None
+            reply = _parse_dhcp_reply(frame, xid)
+            if reply is not None and reply["msg_type"] not in skip_types:
+                return reply
+
     def do_dhcp_sequence(self):
         """Perform complete DHCP sequence: Discover -> Offer -> Request -> ACK"""
+        listener = None
         try:
             self.log("info", f"🔄 Starting DHCP sequence (mode: {self.dhcp_mode})...")
+            if self._mac_bytes is None:
+                raise ValueError(f"invalid MAC address {self.mac!r}")
             
             self.dhcp_xid = random.randint(1, 0xFFFFFFFF)
             discover_options = self.build_dhcp_options("discover")
             
-            discover = Ether(dst="ff:ff:ff:ff:ff:ff", src=self.mac) / \
-                       IP(src="0.0.0.0", dst="255.255.255.255") / \
-                       UDP(sport=68, dport=67) / \
-                       BOOTP(chaddr=bytes.fromhex(self.mac.replace(':', '')), xid=self.dhcp_xid) / \
-                       DHCP(options=discover_options)
+            discover = self._dhcp_skel / \
+                       BOOTP(chaddr=self._mac_bytes, xid=self.dhcp_xid,
+                             options=discover_options + _DHCP_END)
             
+            # Listen before sending so a fast OFFER cannot be missed
+            listener = _DHCP_REPLIES.register(self.interface, self.dhcp_xid)
+
             self.log("info", f"📤 Sending DHCP DISCOVER (xid: {hex(self.dhcp_xid)}, MAC: {self.mac})")
             if JSON_OUTPUT:
                 emit_json("dhcp_discover", device_id=self.id, xid=hex(self.dhcp_xid), mac=self.mac)
-            sendp(discover, iface=self.interface, verbose=0)
+            self._get_l2_socket().send(discover)
             
             self.log("info", f"⏳ Waiting for DHCP OFFER (timeout: 3s)...")
             
             try:
-                def dhcp_filter(pkt):
-                    if DHCP in pkt and BOOTP in pkt:
-                        if pkt[BOOTP].xid == self.dhcp_xid:
-                            return True
-                    return False
-                
-                packets = sniff(
-                    iface=self.interface,
-                    lfilter=dhcp_filter,
-                    timeout=3,
-                    count=1,
-                    store=1
-                )
+                offer = self._wait_dhcp_reply(listener)
                 
-                if packets:
-                    offer_pkt = packets[0]
-                    options = self.parse_dhcp_options(offer_pkt)
-                    msg_type = options.get('message-type')
+                if offer:
+                    msg_type = offer["msg_type"]
                     
                     if msg_type == 2:
-                        self.dhcp_offered_ip = offer_pkt[BOOTP].yiaddr
-                        self.dhcp_server_ip = offer_pkt[BOOTP].siaddr or offer_pkt[IP].src
+                        self.dhcp_offered_ip = offer["yiaddr"]
+                        siaddr = offer["siaddr"]
+                        self.dhcp_server_ip = siaddr if siaddr != "0.0.0.0" else offer["src"]
                         
                         self.log("info", f"✅ Received DHCP OFFER from {self.dhcp_server_ip} (Offered IP: {self.dhcp_offered_ip})")
                         if JSON_OUTPUT:
@@ -733,65 +1190,50 @@ class IoTDevice:
             
             time.sleep(0.5)
             
-            dhcp_options = self.build_dhcp_options("request")
-            if dhcp_options and dhcp_options[-1] == ("end"):
-                dhcp_options = dhcp_options[:-1]
+            dhcp_options = [self.build_dhcp_options("request")]
             
             if self.dhcp_mode == "static" and self.ip_static:
-                dhcp_options.append(("requested_addr", self.ip_static))
+                dhcp_options.append(_dhcp_option(50, _pack_ip(self.ip_static)))
                 self.log("info", f"📤 Sending DHCP REQUEST for static IP {self.ip_static}")
             elif self.dhcp_offered_ip:
-                dhcp_options.append(("requested_addr", self.dhcp_offered_ip))
+                dhcp_options.append(_dhcp_option(50, _pack_ip(self.dhcp_offered_ip)))
                 self.ip = self.dhcp_offered_ip
                 self.log("info", f"📤 Sending DHCP REQUEST for offered IP {self.dhcp_offered_ip}")
             else:
                 self.log("info", "📤 Sending DHCP REQUEST (accepting any IP from server)")
             
-            if self.dhcp_server_ip:
-                dhcp_options.append(("server_id", self.dhcp_server_ip))
-            else:
-                dhcp_options.append(("server_id", self.gateway))
-            
-            dhcp_options.append(("end"))
+            server_id = self.dhcp_server_ip or self.gateway
+            dhcp_options.append(_dhcp_option(54, _pack_ip(server_id)))
+            dhcp_options.append(_DHCP_END)
             
-            request = Ether(dst="ff:ff:ff:ff:ff:ff", src=self.mac) / \
-                      IP(src="0.0.0.0", dst="255.255.255.255") / \
-                      UDP(sport=68, dport=67) / \
-                      BOOTP(chaddr=bytes.fromhex(self.mac.replace(':', '')), xid=self.dhcp_xid) / \
-                      DHCP(options=dhcp_options)
+            request = self._dhcp_skel / \
+                      BOOTP(chaddr=self._mac_bytes, xid=self.dhcp_xid,
+                            options=b"".join(dhcp_options))
             
-            sendp(request, iface=self.interface, verbose=0)
+            self._get_l2_socket().send(request)
             
             self.log("info", f"⏳ Waiting for DHCP ACK (timeout: 3s)...")
             
             try:
-                packets = sniff(
-                    iface=self.interface,
-                    lfilter=dhcp_filter,
-                    timeout=3,
-                    count=1,
-                    store=1
-                )
+                ack = self._wait_dhcp_reply(listener, skip_types=(2,))
                 
-                if packets:
-                    ack_pkt = packets[0]
-                    options = self.parse_dhcp_options(ack_pkt)
-                    msg_type = options.get('message-type')
+                if ack:
+                    msg_type = ack["msg_type"]
                     
                     if msg_type == 5:
-                        assigned_ip = ack_pkt[BOOTP].yiaddr
+                        assigned_ip = ack["yiaddr"]
                         self.ip = assigned_ip
                         
-                        router = options.get('router')
-                        if router:
-                            self.gateway = router[0] if isinstance(router, list) else router
+                        router = ack["options"].get(3, b"")
+                        if len(router) >= 4:
+                            self.gateway = socket.inet_ntoa(router[:4])
                             self.log("info", f"🌐 Gateway from DHCP: {self.gateway}")
                         else:
                             self.log("warning", f"⚠️ No router option in DHCP ACK, keeping {self.gateway}")
                         
-                        self.log("info", f"✅ Received DHCP ACK from {ack_pkt[IP].src} (Assigned IP: {assigned_ip})")
+                        self.log("info", f"✅ Received DHCP ACK from {ack['src']} (Assigned IP: {assigned_ip})")
                         if JSON_OUTPUT:
-                            emit_json("dhcp_ack", device_id=self.id, assigned_ip=assigned_ip, server_id=ack_pkt[IP].src, gateway=self.gateway)
+                            emit_json("dhcp_ack", device_id=self.id, assigned_ip=assigned_ip, server_id=ack['src'], gateway=self.gateway)
                     elif msg_type == 6:
                         self.log("error", "❌ Received DHCP NAK - request rejected by server")
                     else:
@@ -806,139 +1248,122 @@ class IoTDevice:
             
         except Exception as e:
             self.log("error", f"❌ DHCP sequence error: {e}")
+        finally:
+            if listener is not None:
+                _DHCP_REPLIES.unregister(self.dhcp_xid)
     
-    def dhcp_renewal_loop(self):
-        """Periodic DHCP renewal"""
+    def dhcp_renewal_loop(self, stop_event):
+        """Periodic DHCP renewal on fixed monotonic deadlines, until stop_event is set"""
         self.log("debug", "DHCP renewal thread started")
-        time.sleep(self.traffic_interval * 5)
+        period = self.traffic_interval * 5
+        next_fire = time.monotonic() + period
         
-        while self.running:
+        # The wait returns early on stop(), and the time spent in
+        # do_dhcp_sequence counts toward the period instead of adding to it
+        while not stop_event.wait(max(0, next_fire - time.monotonic())):
             try:
                 logger.info(f"🔄 {self.id}: Performing DHCP renewal...")
                 self.do_dhcp_sequence()
             except Exception as e:
                 self.log("error", f"❌ DHCP renewal error: {e}")
-            time.sleep(self.traffic_interval * 5)
+            next_fire = max(next_fire + period, time.monotonic())
     
     def send_lldp(self):
         """Send LLDP advertisements periodically"""
         self.log("info", "📡 LLDP thread started")
         
+        # Every field is a per-device constant, so serialize the frame once
+        lldp_frame = bytes(Ether(dst=LLDP_NEAREST_BRIDGE_MAC, src=self.mac) /
+                           LLDPDUChassisID(subtype=4, id=self.mac.encode()) /
+                           LLDPDUPortID(subtype=3, id=self.mac.encode()) /
+                           LLDPDUTimeToLive(ttl=120) /
+                           LLDPDUSystemName(system_name=self.name.encode()) /
+                           LLDPDUSystemDescription(
+                               description=f"{self.vendor} {self.device_type}".encode()
+                           ) /
+                           LLDPDUEndOfLLDPDU())
+        
         while self.running:
             try:
                 if "dhcp" in self.protocols:
                     wait_count = 0
                     while (not self.ip or self.ip == "0.0.0.0") and wait_count < 20:
-                        time.sleep(0.5)
+                        yield 0.5
                         wait_count += 1
                 
-                lldp_frame = Ether(dst=LLDP_NEAREST_BRIDGE_MAC, src=self.mac) / \
-                             LLDPDUChassisID(subtype=4, id=self.mac.encode()) / \
-                             LLDPDUPortID(subtype=3, id=self.mac.encode()) / \
-                             LLDPDUTimeToLive(ttl=120) / \
-                             LLDPDUSystemName(system_name=self.name.encode()) / \
-                             LLDPDUSystemDescription(
-                                 description=f"{self.vendor} {self.device_type}".encode()
-                             ) / \
-                             LLDPDUEndOfLLDPDU()
-                
                 self._sendp(lldp_frame, protocol="lldp", iface=self.interface, verbose=0)
-                self.log("info", f"📡 LLDP advertisement sent to switch")
+                self.log("info", "📡 LLDP advertisement sent to switch")
                 
             except Exception as e:
                 self.log("error", f"❌ LLDP error: {e}")
             
-            time.sleep(30)
+            yield 30
     
     def send_arp(self):
         """Send ARP requests"""
         self.log("debug", "🔍 ARP thread started")
         
+        # Serialized once; per send only the sender/target IPs are patched in,
+        # and the bytes go straight to the AF_PACKET socket without scapy
+        frame = bytes(Ether(dst="ff:ff:ff:ff:ff:ff", src=self.mac) /
+                      ARP(op="who-has", hwsrc=self.mac, psrc="0.0.0.0", pdst="0.0.0.0"))
+        
         while self.running:
             try:
-                pkt = Ether(dst="ff:ff:ff:ff:ff:ff", src=self.mac) / \
-                      ARP(op="who-has", 
-                          pdst=self.gateway, 
-                          hwsrc=self.mac, 
-                          psrc=self.ip)
+                pkt = bytearray(frame)
+                pkt[28:32] = _pack_ip(self.ip or "0.0.0.0")
+                pkt[38:42] = _pack_ip(self.gateway)
                 
                 self._sendp(pkt, protocol="arp", iface=self.interface, verbose=0)
-                self.log("debug", f"📤 ARP request sent for gateway {self.gateway}")
+                self.log("debug", "📤 ARP request sent for gateway %s", self.gateway)
                 
             except Exception as e:
                 self.log("error", f"❌ ARP error: {e}")
             
-            time.sleep(self.traffic_interval)
+            yield self.traffic_interval
     
-    def send_http(self):
-        """Send HTTP requests"""
-        self.log("debug", "🌐 HTTP thread started")
-        
-        while self.running:
-            try:
-                pkt = IP(src=self.ip, dst=self.gateway) / \
-                      TCP(dport=80, flags="S")
-                
-                self._send(pkt, protocol="http", verbose=0)
-                self.log("debug", f"📤 HTTP SYN sent to {self.gateway}:80")
-                
-            except Exception as e:
-                self.log("error", f"❌ HTTP error: {e}")
-            
-            time.sleep(self.traffic_interval)
-    
-    def send_mqtt(self):
-        """Send MQTT publish packets"""
-        self.log("debug", "💬 MQTT thread started")
-        mqtt_broker = "192.168.207.150"
-        
-        while self.running:
-            try:
-                pkt = IP(src=self.ip, dst=mqtt_broker) / \
-                      TCP(dport=1883, flags="S")
-                
-                self._send(pkt, protocol="mqtt", verbose=0)
-                self.log("debug", f"📤 MQTT Connect sent to {mqtt_broker}:1883")
-                time.sleep(5)
-                
-            except Exception as e:
-                self.log("error", f"❌ MQTT error: {e}")
-            
-            time.sleep(self.traffic_interval)
+    # Periodic TCP SYN protocols: (name, icon, dport, destination or None for the gateway, pause after each send)
+    SYN_PROTOCOLS = {
+        "http": ("HTTP", "🌐", 80, None, 0),
+        "mqtt": ("MQTT", "💬", 1883, "192.168.207.150", 5),
+        "rtsp": ("RTSP", "🎥", 554, None, 0),
+    }
     
-    def send_rtsp(self):
-        """Send RTSP requests"""
-        self.log("debug", "🎥 RTSP thread started")
+    def send_tcp_syn(self, protocol):
+        """Send periodic TCP SYNs for one of SYN_PROTOCOLS"""
+        name, icon, dport, dst, pause = self.SYN_PROTOCOLS[protocol]
+        self.log("debug", "%s %s thread started", icon, name)
         
         while self.running:
             try:
-                pkt = IP(src=self.ip, dst=self.gateway) / \
-                      TCP(dport=554, flags="S")
+                target = dst or self.gateway
                 
-                self._send(pkt, protocol="rtsp", verbose=0)
-                self.log("debug", f"📤 RTSP SYN sent to {self.gateway}:554")
+                # Source port 20 is what the scapy-built SYNs always carried
+                self._send_tcp_raw(self._tcp_segment_bytes(target, dport), 20, protocol=protocol)
+                self.log("debug", "📤 %s SYN sent to %s:%d", name, target, dport)
+                if pause:
+                    yield pause
                 
             except Exception as e:
-                self.log("error", f"❌ RTSP error: {e}")
+                self.log("error", f"❌ {name} error: {e}")
             
-            time.sleep(self.traffic_interval)
+            yield self.traffic_interval
     
     def send_mdns(self):
         """Send mDNS requests"""
         self.log("debug", "🔎 mDNS thread started")
         
+        datagram = self._udp_datagram_bytes(5353)
+        
         while self.running:
             try:
-                pkt = IP(src=self.ip, dst="224.0.0.251") / \
-                      UDP(sport=5353, dport=5353)
-                
-                self._send(pkt, protocol="mdns", verbose=0)
+                self._send_udp_raw(datagram, "224.0.0.251", 5353, protocol="mdns")
                 self.log("debug", "📤 mDNS query sent")
                 
             except Exception as e:
                 self.log("error", f"❌ mDNS error: {e}")
             
-            time.sleep(self.traffic_interval * 3)
+            yield self.traffic_interval * 3
     
     def send_cloud_traffic(self):
         """Send HTTPS traffic to vendor cloud servers"""
@@ -954,24 +1379,18 @@ class IoTDevice:
         while self.running:
             try:
                 for server in servers:
-                    pkt = IP(src=self.ip, dst=server) / \
-                          TCP(dport=443, flags="S")
-                    
-                    self._send(pkt, protocol="cloud", verbose=0)
-                    self.log("info", f"☁️ Cloud HTTPS sent to {server}:443")
-                    time.sleep(2)
-                    
-                    pkt_http = IP(src=self.ip, dst=server) / \
-                               TCP(dport=80, flags="S")
+                    self._send_tcp_raw(self._tcp_segment_bytes(server, 443), 20, protocol="cloud")
+                    self.log("info", "☁️ Cloud HTTPS sent to %s:443", server)
+                    yield 2
                     
-                    self._send(pkt_http, protocol="cloud", verbose=0)
-                    self.log("info", f"☁️ Cloud HTTP sent to {server}:80")
-                    time.sleep(3)
+                    self._send_tcp_raw(self._tcp_segment_bytes(server, 80), 20, protocol="cloud")
+                    self.log("info", "☁️ Cloud HTTP sent to %s:80", server)
+                    yield 3
                 
             except Exception as e:
                 self.log("error", f"❌ Cloud traffic error: {e}")
             
-            time.sleep(self.traffic_interval * 2)
+            yield self.traffic_interval * 2
     
     def send_dns(self):
         """Send DNS queries to public resolvers"""
@@ -985,38 +1404,33 @@ class IoTDevice:
             try:
                 for domain in domains:
                     for dns_server in dns_servers:
-                        pkt = IP(src=self.ip, dst=dns_server) / \
-                              UDP(sport=53000, dport=53) / \
-                              DNS(rd=1, qd=DNSQR(qname=domain))
-                        
-                        self._send(pkt, protocol="dns", verbose=0)
-                        self.log("info", f"🌐 DNS query sent: {domain} → {dns_server}")
-                        time.sleep(1)
+                        self._send_udp_raw(self._dns_query_bytes(domain), dns_server, 53000, protocol="dns")
+                        self.log("info", "🌐 DNS query sent: %s → %s", domain, dns_server)
+                        yield 1
                 
             except Exception as e:
                 self.log("error", f"❌ DNS error: {e}")
             
-            time.sleep(self.traffic_interval * 3)
+            yield self.traffic_interval * 3
     
     def send_ntp(self):
         """Send NTP time sync requests"""
         self.log("debug", "🕐 NTP thread started")
         ntp_servers = self.PUBLIC_SERVICES["ntp"]
         
+        datagram = self._udp_datagram_bytes(123)
+        
         while self.running:
             try:
                 for ntp_server in ntp_servers:
-                    pkt = IP(src=self.ip, dst=ntp_server) / \
-                          UDP(sport=123, dport=123)
-                    
-                    self._send(pkt, protocol="ntp", verbose=0)
-                    self.log("info", f"🕐 NTP request sent to {ntp_server}")
-                    time.sleep(2)
+                    self._send_udp_raw(datagram, ntp_server, 123, protocol="ntp")
+                    self.log("info", "🕐 NTP request sent to %s", ntp_server)
+                    yield 2
                 
             except Exception as e:
                 self.log("error", f"❌ NTP error: {e}")
             
-            time.sleep(self.traffic_interval * 5)
+            yield self.traffic_interval * 5
 
 
 class IoTEmulator:
@@ -1054,8 +1468,9 @@ class IoTEmulator:
     def load_config(self):
         """Load device configuration from JSON"""
         try:
-            with open(self.config_file, 'r') as f:
-                config = json.load(f)
+            # Parse straight from bytes, with orjson when it is installed
+            data = self.config_file.read_bytes()
+            config = orjson.loads(data) if orjson else json.loads(data)
             
             logger.info(f"✅ Loaded config from {self.config_file}")
             
@@ -1093,10 +1508,13 @@ class IoTEmulator:
         """Start all enabled devices"""
         logger.info("🚀 Starting all devices...")
         
+        # Every device sends its DISCOVER right away; only the traffic loops
+        # keep the 0.5s per-device offset, via the scheduler rather than sleeping
+        stagger = 0
         for device in self.devices:
             if device.enabled:
-                device.start()
-                time.sleep(0.5)
+                device.start(stagger)
+                stagger += 0.5
         
         logger.info(f"✅ All {len([d for d in self.devices if d.enabled])} devices started")
     
@@ -5,56 +5,153 @@ This module provides an async client for interacting with the REST APIs
 of individual traffic generator instances.
 """
 
+import asyncio
+import json
 import jwt
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, Optional
+import time
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple, Union
 
 import httpx
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from ..types import Agent, AgentStats
 
 logger = logging.getLogger(__name__)
 
 
+def _dumps(obj) -> bytes:
+    """Serialize a request body to JSON bytes."""
+    if orjson:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+
+def _loads(response: httpx.Response):
+    """Parse a JSON response body."""
+    if orjson:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+# Process-wide connection pool shared by every AgentClient (see get_shared_client)
+_shared_client: Optional[httpx.AsyncClient] = None
+
+# Minted JWTs keyed by secret: (token, exp). AgentClient instances are
+# short-lived, so the cache lives at module level to survive across calls.
+_token_cache: Dict[str, Tuple[str, float]] = {}
+_TOKEN_LIFETIME = 15 * 60
+_TOKEN_REFRESH_MARGIN = 60
+
+# Upper bound on concurrent requests in AgentClient.gather
+_GATHER_CONCURRENCY = 50
+
+
+def get_shared_client() -> httpx.AsyncClient:
+    """
+    Return the process-wide HTTP client, creating it on first use.
+    
+    Reusing one pool keeps TCP connections to agents alive across tool calls
+    instead of reconnecting for every AgentClient context.
+    """
+    global _shared_client
+    if _shared_client is None or _shared_client.is_closed:
+        _shared_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_keepalive_connections=100, max_connections=200)
+        )
+    return _shared_client
+
+
 class AgentClient:
     """Async HTTP client for a single SD-WAN traffic generator agent."""
     
-    def __init__(self, agent: Agent, timeout: float = 10.0):
+    def __init__(self, agent: Agent, timeout: float = 10.0,
+                 client: Optional[httpx.AsyncClient] = None):
         """
         Initialize agent client.
         
         Args:
             agent: Agent configuration
             timeout: HTTP request timeout in seconds
+            client: HTTP client to use (defaults to the shared connection pool)
         """
         self.agent = agent
         self.timeout = timeout
-        self._client: Optional[httpx.AsyncClient] = None
+        self._client: Optional[httpx.AsyncClient] = client
     
     async def __aenter__(self):
         """Async context manager entry."""
-        self._client = httpx.AsyncClient(timeout=self.timeout)
+        if self._client is None:
+            self._client = get_shared_client()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit."""
-        if self._client:
-            await self._client.aclose()
+        """Async context manager exit (the pooled client stays open for reuse)."""
+    
+    @classmethod
+    async def gather(
+        cls,
+        method: Union[str, Callable[..., Awaitable]],
+        agents: Iterable[Agent],
+        **kwargs
+    ) -> Dict[str, Union[object, BaseException]]:
+        """
+        Run one operation against many agents concurrently.
+        
+        Args:
+            method: AgentClient method name (e.g. "get_stats"), or an async
+                callable taking the client as its first argument
+            agents: Agents to query
+            **kwargs: Extra arguments passed to the operation
+            
+        Returns:
+            Dictionary mapping agent ID to the result, or to the exception
+            raised for that agent
+        """
+        semaphore = asyncio.Semaphore(_GATHER_CONCURRENCY)
+        
+        async def run(agent: Agent):
+            async with semaphore:
+                async with cls(agent) as client:
+                    if isinstance(method, str):
+                        return await getattr(client, method)(**kwargs)
+                    return await method(client, **kwargs)
+        
+        agents = list(agents)
+        results = await asyncio.gather(
+            *(run(agent) for agent in agents),
+            return_exceptions=True
+        )
+        return {agent.id: result for agent, result in zip(agents, results)}
     
     def _generate_jwt_token(self) -> str:
         """
         Generate JWT token for authentication.
         
+        Tokens are reused until one minute before they expire.
+        
         Returns:
             JWT token string
         """
+        secret = self.agent.jwt_secret
+        now = time.time()
+        cached = _token_cache.get(secret)
+        if cached and now < cached[1] - _TOKEN_REFRESH_MARGIN:
+            return cached[0]
+        
+        exp = int(now) + _TOKEN_LIFETIME
         payload = {
-            'exp': datetime.utcnow() + timedelta(minutes=15),
-            'iat': datetime.utcnow(),
+            'exp': exp,
+            'iat': int(now),
             'sub': 'mcp-server'
         }
-        return jwt.encode(payload, self.agent.jwt_secret, algorithm='HS256')
+        token = jwt.encode(payload, secret, algorithm='HS256')
+        _token_cache[secret] = (token, exp)
+        return token
     
     def _get_headers(self) -> Dict[str, str]:
         """Get HTTP headers with JWT authentication."""
@@ -77,10 +174,10 @@ class AgentClient:
         url = f"{self.agent.url}/api/status"
         
         try:
-            response = await self._client.get(url, headers=self._get_headers())
+            response = await self._client.get(url, headers=self._get_headers(), timeout=self.timeout)
             response.raise_for_status()
             logger.debug(f"[{self.agent.id}] Status: {response.status_code}")
-            return response.json()
+            return _loads(response)
         
         except Exception as e:
             logger.error(f"[{self.agent.id}] Failed to get status: {e}")
@@ -99,10 +196,10 @@ class AgentClient:
         url = f"{self.agent.url}/api/traffic/start"
         
         try:
-            response = await self._client.post(url, headers=self._get_headers())
+            response = await self._client.post(url, headers=self._get_headers(), timeout=self.timeout)
             response.raise_for_status()
             logger.info(f"[{self.agent.id}] Traffic started")
-            return response.json()
+            return _loads(response)
         
         except Exception as e:
             logger.error(f"[{self.agent.id}] Failed to start traffic: {e}")
@@ -121,10 +218,10 @@ class AgentClient:
         url = f"{self.agent.url}/api/traffic/stop"
         
         try:
-            response = await self._client.post(url, headers=self._get_headers())
+            response = await self._client.post(url, headers=self._get_headers(), timeout=self.timeout)
             response.raise_for_status()
             logger.info(f"[{self.agent.id}] Traffic stopped")
-            return response.json()
+            return _loads(response)
         
         except Exception as e:
             logger.error(f"[{self.agent.id}] Failed to stop traffic: {e}")
@@ -143,9 +240,9 @@ class AgentClient:
         url = f"{self.agent.url}/api/stats"
         
         try:
-            response = await self._client.get(url, headers=self._get_headers())
+            response = await self._client.get(url, headers=self._get_headers(), timeout=self.timeout)
             response.raise_for_status()
-            data = response.json()
+            data = _loads(response)
             
             # Parse stats from API response
             stats = AgentStats(
@@ -183,11 +280,12 @@ class AgentClient:
             response = await self._client.post(
                 url,
                 headers=self._get_headers(),
-                json={'content': applications}
+                content=_dumps({'content': applications}),
+                timeout=self.timeout
             )
             response.raise_for_status()
             logger.info(f"[{self.agent.id}] Configuration updated")
-            return response.json()
+            return _loads(response)
         
         except Exception as e:
             logger.error(f"[{self.agent.id}] Failed to update config: {e}")
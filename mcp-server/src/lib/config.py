@@ -8,17 +8,27 @@ from the config/agents.json file.
 import json
 import logging
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from ..types import Agent, AgentConfig
 
 logger = logging.getLogger(__name__)
 
+# Parsed configuration per path: (st_mtime_ns, agents, agents by ID)
+_agents_cache: Dict[Path, Tuple[int, List[Agent], Dict[str, Agent]]] = {}
+
 
 def load_agents(config_path: Path = Path("/app/config/agents.json")) -> List[Agent]:
     """
     Load and validate agent configuration from JSON file.
     
+    The parsed agents are cached until the file's modification time changes.
+    
     Args:
         config_path: Path to the agents.json configuration file
         
@@ -29,13 +39,52 @@ def load_agents(config_path: Path = Path("/app/config/agents.json")) -> List[Age
         FileNotFoundError: If config file doesn't exist
         ValueError: If config file is invalid or fails validation
     """
-    if not config_path.exists():
+    return list(_load_cached(config_path)[1])
+
+
+def load_agents_by_id(config_path: Path = Path("/app/config/agents.json")) -> Dict[str, Agent]:
+    """
+    Load agent configuration as a mapping of agent ID to Agent.
+    
+    Shares load_agents' cache; callers must not modify the returned dict.
+    
+    Args:
+        config_path: Path to the agents.json configuration file
+        
+    Returns:
+        Dictionary mapping agent ID to validated Agent object
+        
+    Raises:
+        FileNotFoundError: If config file doesn't exist
+        ValueError: If config file is invalid or fails validation
+    """
+    return _load_cached(config_path)[2]
+
+
+def _load_cached(config_path: Path) -> Tuple[int, List[Agent], Dict[str, Agent]]:
+    """Return the cache entry for config_path, re-reading the file if it changed."""
+    try:
+        mtime_ns = config_path.stat().st_mtime_ns
+    except FileNotFoundError:
         logger.error(f"Configuration file not found: {config_path}")
         raise FileNotFoundError(f"Configuration file not found: {config_path}")
     
+    cached = _agents_cache.get(config_path)
+    if cached and cached[0] == mtime_ns:
+        return cached
+    
+    agents = _parse_agents(config_path)
+    entry = (mtime_ns, agents, {agent.id: agent for agent in agents})
+    _agents_cache[config_path] = entry
+    return entry
+
+
+def _parse_agents(config_path: Path) -> List[Agent]:
+    """Read and validate agents.json."""
     try:
-        with open(config_path, 'r') as f:
-            data = json.load(f)
+        with open(config_path, 'rb') as f:
+            raw = f.read()
+        data = orjson.loads(raw) if orjson else json.loads(raw)
         
         # Validate with Pydantic
         config = AgentConfig(**data)
@@ -7,15 +7,71 @@ JSON files in the data/tests/ directory.
 
 import json
 import logging
+import os
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from ..types import TestRun, TestSummary
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from ..types import AgentStats, TestRun, TestSummary
 
 logger = logging.getLogger(__name__)
 
 
+def _write_json(path: Path, data: dict) -> None:
+    """Write data to path as indented JSON."""
+    if orjson:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2, default=str)
+
+
+def _read_json(path: Path) -> dict:
+    """Read and parse a JSON file."""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+
+def _construct_test(data: dict) -> TestRun:
+    """
+    Build a TestRun from a file written by this module, skipping validation.
+    
+    The data was validated before it was written, so only the fields JSON
+    cannot represent natively (datetimes, nested stats) are converted.
+    """
+    end_time = data.get('end_time')
+    final_stats = data.get('final_stats')
+    return TestRun.model_construct(**{
+        **data,
+        'start_time': datetime.fromisoformat(data['start_time']),
+        'end_time': datetime.fromisoformat(end_time) if end_time else None,
+        'final_stats': {
+            agent_id: AgentStats.model_construct(**stats)
+            for agent_id, stats in final_stats.items()
+        } if final_stats else None
+    })
+
+
+def _summarize(test: TestRun) -> dict:
+    """Build the JSON-ready index entry for a test run."""
+    return TestSummary(
+        id=test.id,
+        label=test.label,
+        start_time=test.start_time,
+        duration_minutes=test.duration_minutes,
+        status=test.status,
+        agent_count=len(test.agents),
+        profile=test.profile
+    ).model_dump(mode='json')
+
+
 class TestStorage:
     """Manages persistence of test runs to JSON files."""
     
@@ -28,12 +84,100 @@ class TestStorage:
         """
         self.data_dir = data_dir
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Summary of every test run, so list_tests reads one file instead of all of them
+        self.index_path = data_dir / "_index.json"
+        self._index: Optional[Dict[str, dict]] = None
+        self._index_mtime_ns: Optional[int] = None
+        
+        # ID of the test currently running; absent when none is
+        self._running_ptr = data_dir / "_running"
+        
         logger.info(f"Test storage initialized at {self.data_dir}")
     
     def _get_test_path(self, test_id: str) -> Path:
         """Get the file path for a test ID."""
         return self.data_dir / f"{test_id}.json"
     
+    def _test_files(self) -> List[Path]:
+        """
+        Get the test run files, most recently modified first.
+        
+        Bookkeeping files start with an underscore and are skipped. scandir
+        filters on the directory entries themselves, so only the matching
+        files are stat()ed for the sort.
+        """
+        with os.scandir(self.data_dir) as it:
+            entries = [
+                entry for entry in it
+                if entry.name.endswith(".json")
+                and not entry.name.startswith("_")
+                and entry.is_file(follow_symlinks=False)
+            ]
+        entries.sort(key=lambda entry: entry.stat().st_mtime_ns, reverse=True)
+        return [Path(entry.path) for entry in entries]
+    
+    def _load_index(self) -> Dict[str, dict]:
+        """Get the summary index, re-reading it only when it changed on disk."""
+        try:
+            mtime_ns = self.index_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            # First use, or test files written before the index existed
+            return self._rebuild_index()
+        
+        if self._index is None or mtime_ns != self._index_mtime_ns:
+            try:
+                self._index = _read_json(self.index_path)
+            except Exception as e:
+                logger.error(f"Failed to read test index, rebuilding: {e}")
+                return self._rebuild_index()
+            self._index_mtime_ns = mtime_ns
+        
+        return self._index
+    
+    def _save_index(self, index: Dict[str, dict]) -> None:
+        """Atomically replace the summary index on disk."""
+        tmp_path = self.index_path.with_suffix(".tmp")
+        _write_json(tmp_path, index)
+        os.replace(tmp_path, self.index_path)
+        self._index = index
+        self._index_mtime_ns = self.index_path.stat().st_mtime_ns
+    
+    def _rebuild_index(self) -> Dict[str, dict]:
+        """Build the summary index from every test run file."""
+        index = {}
+        for test_file in self._test_files():
+            try:
+                test = _construct_test(_read_json(test_file))
+                index[test.id] = _summarize(test)
+            except Exception as e:
+                logger.error(f"Failed to index test from {test_file}: {e}")
+        
+        self._save_index(index)
+        logger.info(f"Rebuilt test index ({len(index)} test(s))")
+        return index
+    
+    def _track_running(self, test: TestRun) -> None:
+        """Point _running at test while it runs, and clear it once it stops."""
+        if test.status == "running":
+            self._running_ptr.write_text(test.id)
+        else:
+            self._clear_running(test.id)
+    
+    def _clear_running(self, test_id: str) -> None:
+        """Remove the running-test pointer if it refers to test_id."""
+        try:
+            if self._running_ptr.read_text().strip() == test_id:
+                self._running_ptr.unlink()
+        except FileNotFoundError:
+            pass
+    
+    def _index_test(self, test: TestRun) -> None:
+        """Insert or refresh the index entry for a test run."""
+        index = self._load_index()
+        index[test.id] = _summarize(test)
+        self._save_index(index)
+    
     def create_test(self, test: TestRun) -> None:
         """
         Create a new test run.
@@ -43,8 +187,9 @@ class TestStorage:
         """
         test_path = self._get_test_path(test.id)
         
-        with open(test_path, 'w') as f:
-            json.dump(test.model_dump(mode='json'), f, indent=2, default=str)
+        _write_json(test_path, test.model_dump(mode='json'))
+        self._index_test(test)
+        self._track_running(test)
         
         logger.info(f"Created test run: {test.id}")
     
@@ -65,10 +210,9 @@ class TestStorage:
             return None
         
         try:
-            with open(test_path, 'r') as f:
-                data = json.load(f)
+            data = _read_json(test_path)
             
-            return TestRun(**data)
+            return _construct_test(data)
         
         except Exception as e:
             logger.error(f"Failed to load test {test_id}: {e}")
@@ -83,8 +227,9 @@ class TestStorage:
         """
         test_path = self._get_test_path(test.id)
         
-        with open(test_path, 'w') as f:
-            json.dump(test.model_dump(mode='json'), f, indent=2, default=str)
+        _write_json(test_path, test.model_dump(mode='json'))
+        self._index_test(test)
+        self._track_running(test)
         
         logger.info(f"Updated test run: {test.id}")
     
@@ -98,32 +243,19 @@ class TestStorage:
         Returns:
             List of TestSummary objects
         """
-        test_files = sorted(
-            self.data_dir.glob("*.json"),
-            key=lambda p: p.stat().st_mtime,
+        entries = sorted(
+            self._load_index().values(),
+            key=lambda entry: entry['start_time'],
             reverse=True
         )
         
         summaries = []
-        for test_file in test_files[:limit] if limit else test_files:
+        for entry in entries[:limit] if limit else entries:
             try:
-                with open(test_file, 'r') as f:
-                    data = json.load(f)
-                
-                test = TestRun(**data)
-                summary = TestSummary(
-                    id=test.id,
-                    label=test.label,
-                    start_time=test.start_time,
-                    duration_minutes=test.duration_minutes,
-                    status=test.status,
-                    agent_count=len(test.agents),
-                    profile=test.profile
-                )
-                summaries.append(summary)
+                summaries.append(TestSummary(**entry))
             
             except Exception as e:
-                logger.error(f"Failed to load test from {test_file}: {e}")
+                logger.error(f"Invalid index entry for test {entry.get('id')}: {e}")
                 continue
         
         logger.info(f"Listed {len(summaries)} test(s)")
@@ -136,17 +268,20 @@ class TestStorage:
         Returns:
             TestRun object if a running test exists, None otherwise
         """
-        for test_file in self.data_dir.glob("*.json"):
-            try:
-                with open(test_file, 'r') as f:
-                    data = json.load(f)
-                
-                test = TestRun(**data)
-                if test.status == "running":
-                    return test
-            
-            except Exception as e:
-                logger.error(f"Failed to check test {test_file}: {e}")
-                continue
+        try:
+            test_id = self._running_ptr.read_text().strip()
+        except FileNotFoundError:
+            # No pointer, e.g. a test started before the pointer existed: fall
+            # back to the statuses recorded in the index
+            running = [entry for entry in self._load_index().values() if entry['status'] == "running"]
+            if not running:
+                return None
+            test_id = max(running, key=lambda entry: entry['start_time'])['id']
+        
+        test = self.get_test(test_id)
+        if test is None or test.status != "running":
+            logger.warning(f"Test {test_id} is recorded as running but is not")
+            self._clear_running(test_id)
+            return None
         
-        return None
+        return test
@@ -38,35 +38,29 @@ async def list_agents_tool() -> List[dict]:
     """
     try:
         agents = load_agents()
-        agent_statuses = []
         
+        # Query every agent concurrently
+        results = await AgentClient.gather("get_status", agents)
+        
+        agent_statuses = []
         for agent in agents:
-            try:
-                async with AgentClient(agent) as client:
-                    status_data = await client.get_status()
-                    
-                    # Determine status from API response
-                    traffic_running = status_data.get('trafficRunning', False)
-                    status = "running" if traffic_running else "stopped"
-                    
-                    agent_status = AgentStatus(
-                        id=agent.id,
-                        name=agent.name,
-                        status=status,
-                        url=str(agent.url)
-                    )
-                    agent_statuses.append(agent_status.model_dump())
-            
-            except Exception as e:
-                logger.error(f"Failed to get status for agent {agent.id}: {e}")
+            status_data = results[agent.id]
+            if isinstance(status_data, BaseException):
+                logger.error(f"Failed to get status for agent {agent.id}: {status_data}")
                 # Return error status for unreachable agents
-                agent_status = AgentStatus(
-                    id=agent.id,
-                    name=agent.name,
-                    status="error",
-                    url=str(agent.url)
-                )
-                agent_statuses.append(agent_status.model_dump())
+                status = "error"
+            else:
+                # Determine status from API response
+                traffic_running = status_data.get('trafficRunning', False)
+                status = "running" if traffic_running else "stopped"
+            
+            agent_status = AgentStatus(
+                id=agent.id,
+                name=agent.name,
+                status=status,
+                url=str(agent.url)
+            )
+            agent_statuses.append(agent_status.model_dump())
         
         logger.info(f"Listed {len(agent_statuses)} agent(s)")
         return agent_statuses
@@ -5,7 +5,7 @@ from pathlib import Path
 from typing import Optional
 
 from ..lib.agent_client import AgentClient
-from ..lib.config import load_agents
+from ..lib.config import load_agents_by_id
 
 logger = logging.getLogger(__name__)
 
@@ -35,7 +35,7 @@ async def set_traffic_profile_tool(agent_id: str, profile: str) -> dict:
     """
     try:
         # Load agent configuration
-        agents = {agent.id: agent for agent in load_agents()}
+        agents = load_agents_by_id()
         
         if agent_id not in agents:
             raise ValueError(f"Unknown agent ID: {agent_id}")
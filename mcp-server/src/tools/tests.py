@@ -5,7 +5,7 @@ from datetime import datetime
 from typing import Dict, List, Optional
 
 from ..lib.agent_client import AgentClient
-from ..lib.config import load_agents
+from ..lib.config import load_agents_by_id
 from ..lib.storage import TestStorage
 from ..types import Agent, AgentStats, AgentStatus, TestRun, TestStatus, TestSummary
 
@@ -15,6 +15,29 @@ logger = logging.getLogger(__name__)
 storage = TestStorage()
 
 
+async def _stop_and_collect(client: AgentClient) -> dict:
+    """Stop traffic on one agent and return its final stats."""
+    await client.stop_traffic()
+    stats = await client.get_stats()
+    return stats.model_dump()
+
+
+async def _agent_status(client: AgentClient) -> dict:
+    """Fetch status and stats from one agent as an AgentStatus dict."""
+    agent = client.agent
+    status_data = await client.get_status()
+    stats = await client.get_stats()
+    
+    agent_status = AgentStatus(
+        id=agent.id,
+        name=agent.name,
+        status="running" if status_data.get('trafficRunning') else "stopped",
+        url=str(agent.url),
+        stats=stats
+    )
+    return agent_status.model_dump()
+
+
 async def start_traffic_test_tool(
     agents: List[str],
     profile: str,
@@ -39,7 +62,7 @@ async def start_traffic_test_tool(
     """
     try:
         # Load agent configurations
-        all_agents = {agent.id: agent for agent in load_agents()}
+        all_agents = load_agents_by_id()
         
         # Validate requested agents exist
         invalid_agents = [aid for aid in agents if aid not in all_agents]
@@ -60,17 +83,18 @@ async def start_traffic_test_tool(
             status="running"
         )
         
-        # Start traffic on each agent
+        # Start traffic on all agents concurrently
+        results = await AgentClient.gather(
+            "start_traffic", [all_agents[agent_id] for agent_id in agents]
+        )
         started_agents = []
         for agent_id in agents:
-            agent = all_agents[agent_id]
-            try:
-                async with AgentClient(agent) as client:
-                    await client.start_traffic()
-                    started_agents.append(agent_id)
-            except Exception as e:
-                logger.error(f"Failed to start traffic on {agent_id}: {e}")
+            result = results[agent_id]
+            if isinstance(result, BaseException):
+                logger.error(f"Failed to start traffic on {agent_id}: {result}")
                 # Continue with other agents
+            else:
+                started_agents.append(agent_id)
         
         # Save test run
         storage.create_test(test)
@@ -119,27 +143,23 @@ async def stop_traffic_test_tool(test_id: str) -> dict:
             raise ValueError(f"Test {test_id} is not running (status: {test.status})")
         
         # Load agent configurations
-        all_agents = {agent.id: agent for agent in load_agents()}
+        all_agents = load_agents_by_id()
         
         # Stop traffic and collect stats
-        final_stats = {}
+        test_agents = []
         for agent_id in test.agents:
             if agent_id not in all_agents:
                 logger.warning(f"Agent {agent_id} not found in configuration")
                 continue
-            
-            agent = all_agents[agent_id]
-            try:
-                async with AgentClient(agent) as client:
-                    # Stop traffic
-                    await client.stop_traffic()
-                    
-                    # Get final stats
-                    stats = await client.get_stats()
-                    final_stats[agent_id] = stats.model_dump()
-            
-            except Exception as e:
-                logger.error(f"Failed to stop traffic on {agent_id}: {e}")
+            test_agents.append(all_agents[agent_id])
+        
+        results = await AgentClient.gather(_stop_and_collect, test_agents)
+        final_stats = {}
+        for agent_id, result in results.items():
+            if isinstance(result, BaseException):
+                logger.error(f"Failed to stop traffic on {agent_id}: {result}")
+            else:
+                final_stats[agent_id] = result
         
         # Update test
         test.status = "completed"
@@ -201,31 +221,19 @@ async def get_test_status_tool(test_id: Optional[str] = None) -> dict:
         elapsed = (datetime.now() - test.start_time).total_seconds()
         
         # Load agent configurations
-        all_agents = {agent.id: agent for agent in load_agents()}
+        all_agents = load_agents_by_id()
         
-        # Get current stats from each agent
+        # Get current stats from each agent concurrently
+        results = await AgentClient.gather(
+            _agent_status,
+            [all_agents[agent_id] for agent_id in test.agents if agent_id in all_agents]
+        )
         agent_statuses = []
-        for agent_id in test.agents:
-            if agent_id not in all_agents:
-                continue
-            
-            agent = all_agents[agent_id]
-            try:
-                async with AgentClient(agent) as client:
-                    status_data = await client.get_status()
-                    stats = await client.get_stats()
-                    
-                    agent_status = AgentStatus(
-                        id=agent.id,
-                        name=agent.name,
-                        status="running" if status_data.get('trafficRunning') else "stopped",
-                        url=str(agent.url),
-                        stats=stats
-                    )
-                    agent_statuses.append(agent_status.model_dump())
-            
-            except Exception as e:
-                logger.error(f"Failed to get status for {agent_id}: {e}")
+        for agent_id, result in results.items():
+            if isinstance(result, BaseException):
+                logger.error(f"Failed to get status for {agent_id}: {result}")
+            else:
+                agent_statuses.append(result)
         
         # Build response
         test_status = TestStatus(